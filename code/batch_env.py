@@ -0,0 +1,291 @@
+import math
+import numpy as np
+from tile_map import TileMap
+from player import Player
+from bullet import Bullet
+from bullet_pool import BulletPool
+from entity import Entity
+from kinematic_entity import KinematicEntity
+from map_object import MapObject
+from ray_caster import RayCaster, RayHits
+from distance_field import DistanceField
+
+class BatchEnv:
+    action_names: list[str] = [
+        "forward", "backward", "turn_left", "turn_right",
+        "move_left", "move_right", "shoot"
+    ]
+
+    def __init__(self, tile_map: TileMap, worlds: int,
+    player_pos: tuple[float, float]=(150, 150),
+    entity_pos: tuple[tuple[float, float], ...]=(
+        (300, 300), (100, 50), (200, 100)
+    ),
+    bullet_capacity: int=8, ray_count: int=0, fov: float=math.pi / 2,
+    tick_rate: int=60) -> None:
+        if getattr(tile_map, "grid", None) is None:
+            raise ValueError("batch worlds need a dense tile map")
+
+        self.tile_map = tile_map
+        self.tile_size = self.tile_map.tile_size
+        self.worlds = worlds
+        self.player_pos = player_pos
+        self.entity_pos: np.ndarray = np.array(entity_pos, dtype=np.float64)
+        self.bullet_capacity = bullet_capacity
+        self.dt: float = 1 / tick_rate
+
+        self.init_rules()
+        self.distance_field: DistanceField = DistanceField()
+        self.set_ray_count(ray_count, fov)
+        self.init_state()
+
+
+    def init_rules(self) -> None:
+        player: Player = Player(*self.player_pos, self.tile_map)
+        player.close()
+        entity: Entity = Entity("ghost", 0, 0, self.tile_map)
+        bullet: Bullet = Bullet(0, 0, self.tile_map, 0)
+
+        self.speed: float = player.speed
+        self.rot_speed: float = player.rot_speed
+        self.player_size: tuple[float, float] = (player.width, player.height)
+        self.entity_size: tuple[float, float] = (entity.width, entity.height)
+        self.bullet_size: tuple[float, float] = (bullet.width, bullet.height)
+        self.bullet_speed: float = bullet.speed
+
+        self.max_health: int = player.max_health
+        self.max_magazine: int = player.max_magazine
+        self.ammo_per_magazine: int = player.ammo_per_magazine
+        self.damage_immunity: float = player.damage_immunity
+        self.reload_time: float = player.reload_time
+        self.shooting_period: float = player.shooting_period
+
+
+    def init_state(self) -> None:
+        n: int = self.worlds
+        entities: int = len(self.entity_pos)
+        capacity: int = self.bullet_capacity
+
+        self.x: np.ndarray = np.zeros(n)
+        self.y: np.ndarray = np.zeros(n)
+        self.angle: np.ndarray = np.zeros(n)
+        self.tick: np.ndarray = np.zeros(n, dtype=np.int64)
+        self.health: np.ndarray = np.zeros(n, dtype=np.int32)
+        self.ammo: np.ndarray = np.zeros(n, dtype=np.int32)
+        self.magazine: np.ndarray = np.zeros(n, dtype=np.int32)
+        self.last_shot_time: np.ndarray = np.zeros(n)
+        self.last_damage_time: np.ndarray = np.zeros(n)
+
+        self.entity_x: np.ndarray = np.zeros((n, entities))
+        self.entity_y: np.ndarray = np.zeros((n, entities))
+        self.entity_vel_x: np.ndarray = np.zeros((n, entities))
+        self.entity_vel_y: np.ndarray = np.zeros((n, entities))
+
+        self.bullet_x: np.ndarray = np.zeros((n, capacity))
+        self.bullet_y: np.ndarray = np.zeros((n, capacity))
+        self.bullet_vel_x: np.ndarray = np.zeros((n, capacity))
+        self.bullet_vel_y: np.ndarray = np.zeros((n, capacity))
+        self.bullet_active: np.ndarray = np.zeros((n, capacity), dtype=bool)
+
+        self.reset()
+
+
+    def set_ray_count(self, ray_count: int, fov: float=math.pi / 2) -> None:
+        self.ray_count = ray_count
+        self.ray_offsets: np.ndarray = np.linspace(-fov / 2, fov / 2, ray_count)
+
+
+    def reset(self, worlds: np.ndarray | None=None) -> None:
+        if worlds is None: worlds = np.ones(self.worlds, dtype=bool)
+        time: np.ndarray = self.get_time()[worlds]
+
+        self.x[worlds], self.y[worlds] = self.player_pos
+        self.angle[worlds] = 0
+        self.health[worlds] = self.max_health
+        self.ammo[worlds] = self.ammo_per_magazine
+        self.magazine[worlds] = self.max_magazine
+        self.last_shot_time[worlds] = time - self.shooting_period
+        self.last_damage_time[worlds] = time - self.damage_immunity
+
+        self.entity_x[worlds] = self.entity_pos[:, 0]
+        self.entity_y[worlds] = self.entity_pos[:, 1]
+        self.entity_vel_x[worlds] = 0
+        self.entity_vel_y[worlds] = 0
+        self.bullet_active[worlds] = False
+
+
+    def get_time(self) -> np.ndarray:
+        return self.tick * self.dt
+
+
+    def move(self, x: np.ndarray, y: np.ndarray, vel_x: np.ndarray,
+    vel_y: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return KinematicEntity.move_batch(self.tile_map, x, y, vel_x, vel_y)
+
+
+    def collide(self, ax: np.ndarray, ay: np.ndarray,
+    a_size: tuple[float, float], bx: np.ndarray, by: np.ndarray,
+    b_size: tuple[float, float]) -> np.ndarray:
+        aw, ah = a_size
+        bw, bh = b_size
+        sx: np.ndarray = ax - aw / 2
+        sy: np.ndarray = ay - ah / 2
+        ox: np.ndarray = bx - bw / 2
+        oy: np.ndarray = by - bh / 2
+
+        return (
+            (((sx > ox) & (sx < bx + bw / 2)) |
+            ((ox > sx) & (ox < ax + aw / 2))) &
+            (((sy > oy) & (sy < by + bh / 2)) |
+            ((oy > sy) & (oy < ay + ah / 2)))
+        )
+
+
+    def step(self, actions: np.ndarray) -> dict[str, np.ndarray]:
+        actions = np.asarray(actions, dtype=bool)
+        forward, backward, turn_left, turn_right, move_left, move_right, \
+        shoot = actions.T
+        time: np.ndarray = self.get_time()
+
+        self.update_movement(
+            forward, backward, turn_left, turn_right, move_left, move_right
+        )
+        damaged, bullet_hits = self.update_combat(shoot, time)
+
+        self.entity_x, self.entity_y, _ = self.move(
+            self.entity_x, self.entity_y, self.entity_vel_x, self.entity_vel_y
+        )
+        self.tick += 1
+
+        result: dict[str, np.ndarray] = {
+            "damaged": damaged,
+            "bullet_hits": bullet_hits
+        }
+        if self.ray_count > 0: result.update(self.observe())
+
+        return result
+
+
+    def update_movement(self, forward: np.ndarray, backward: np.ndarray,
+    turn_left: np.ndarray, turn_right: np.ndarray, move_left: np.ndarray,
+    move_right: np.ndarray) -> None:
+        rot_vel: np.ndarray = np.where(
+            turn_right, self.rot_speed, np.where(turn_left, -self.rot_speed, 0)
+        )
+
+        count: np.ndarray = (
+            forward.astype(np.int32) + backward + move_left + move_right
+        )
+        angle_sum: np.ndarray = (
+            backward * math.pi + move_right * math.pi / 2 +
+            np.where(move_left & backward, math.pi * 3 / 2,
+            np.where(move_left, -math.pi / 2, 0))
+        )
+        moving: np.ndarray = count > 0
+        movement_angle: np.ndarray = angle_sum / np.maximum(count, 1)
+
+        vel_x: np.ndarray = np.where(
+            moving, np.cos(movement_angle + self.angle) * self.speed, 0
+        )
+        vel_y: np.ndarray = np.where(
+            moving, np.sin(movement_angle + self.angle) * self.speed, 0
+        )
+        self.x, self.y, _ = self.move(self.x, self.y, vel_x, vel_y)
+
+        self.angle += rot_vel
+        self.angle = np.where(
+            self.angle >= math.tau, self.angle - math.tau, self.angle
+        )
+        self.angle = np.where(self.angle < 0, self.angle + math.tau, self.angle)
+
+
+    def update_combat(self, shoot: np.ndarray,
+    time: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        ready: np.ndarray = self.last_shot_time + self.reload_time < time
+        reload: np.ndarray = ready & (self.ammo < 1) & (self.magazine > 0)
+        self.magazine -= reload
+        self.ammo[reload] = self.ammo_per_magazine
+
+        rows: np.ndarray = np.arange(self.worlds)
+        slot: np.ndarray = np.argmin(self.bullet_active, axis=1)
+        fire: np.ndarray = (
+            shoot & ~self.bullet_active[rows, slot] &
+            (self.last_shot_time + self.shooting_period <= time) &
+            (self.ammo >= 1)
+        )
+        self.ammo -= fire
+        self.last_shot_time[fire] = time[fire]
+
+        rows, slot = rows[fire], slot[fire]
+        self.bullet_x[rows, slot] = self.x[fire]
+        self.bullet_y[rows, slot] = self.y[fire]
+        self.bullet_vel_x[rows, slot] = (
+            np.cos(self.angle[fire]) * self.bullet_speed
+        )
+        self.bullet_vel_y[rows, slot] = (
+            np.sin(self.angle[fire]) * self.bullet_speed
+        )
+        self.bullet_active[rows, slot] = True
+
+        rows, slot = np.nonzero(self.bullet_active)
+        x: np.ndarray = self.bullet_x[rows, slot]
+        y: np.ndarray = self.bullet_y[rows, slot]
+        vel_x: np.ndarray = self.bullet_vel_x[rows, slot]
+        vel_y: np.ndarray = self.bullet_vel_y[rows, slot]
+
+        wall_t: np.ndarray = BulletPool.sweep_walls(
+            self.tile_map, x, y, vel_x, vel_y
+        )
+        hit_t: np.ndarray = BulletPool.get_entry_times(
+            x[:, np.newaxis], y[:, np.newaxis], vel_x[:, np.newaxis],
+            vel_y[:, np.newaxis], self.bullet_size, self.entity_x[rows],
+            self.entity_y[rows], self.entity_size
+        ).min(axis=1, initial=np.inf)
+
+        hit: np.ndarray = np.zeros_like(self.bullet_active)
+        hit[rows, slot] = np.isfinite(hit_t) & (hit_t <= wall_t)
+        self.bullet_active[rows, slot] &= ~hit[rows, slot] & (wall_t > 1)
+        self.bullet_x += self.bullet_vel_x
+        self.bullet_y += self.bullet_vel_y
+
+        damaged: np.ndarray = (
+            (self.last_damage_time + self.damage_immunity < time) &
+            self.collide(
+                self.x[:, np.newaxis], self.y[:, np.newaxis], self.player_size,
+                self.entity_x, self.entity_y, self.entity_size
+            ).any(axis=1)
+        )
+        self.last_damage_time[damaged] = time[damaged]
+        self.health -= damaged
+
+        return damaged, hit.sum(axis=1)
+
+
+    def observe(self) -> dict[str, np.ndarray]:
+        grid: np.ndarray = self.tile_map.grid
+        if not self.distance_field.grid is grid:
+            self.distance_field.build(grid)
+
+        angles: np.ndarray = (
+            self.angle[:, np.newaxis] + self.ray_offsets
+        ).ravel() % math.tau
+        hits: RayHits = RayHits(
+            np.repeat(self.x, self.ray_count),
+            np.repeat(self.y, self.ray_count), angles
+        )
+        RayCaster.cast_grid(
+            hits, grid, self.distance_field.field,
+            self.distance_field.max_value > 1, (0, 0),
+            self.tile_size, MapObject.depth
+        )
+
+        shape: tuple[int, int] = (self.worlds, self.ray_count)
+        plane_dist: np.ndarray = np.where(
+            hits.has_int,
+            hits.dist * np.tile(np.cos(self.ray_offsets), self.worlds), np.inf
+        )
+
+        return {
+            "plane_dist": plane_dist.reshape(shape),
+            "tile": hits.tile.reshape(shape)
+        }
@@ -0,0 +1,251 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame as pg
+import sys
+import json
+import argparse
+import numpy as np
+from time import perf_counter
+from main import Game
+from player import Player
+from camera import Camera
+from map_object import MapObject
+
+class Benchmark:
+    script: list[tuple[int, tuple[str, ...]]] = [
+        (60, ("forward",)),
+        (30, ("turn_right",)),
+        (60, ("forward", "shoot")),
+        (45, ("turn_left", "move_left")),
+        (60, ("backward", "shoot")),
+        (30, ("move_right", "turn_right"))
+    ]
+
+    subsystems: list[tuple[type, str, str]] = [
+        (Player, "update", "Player.update"),
+        (Camera, "update_rays", "Camera.update_rays"),
+        (Camera, "draw_3d", "Camera.draw_3d"),
+        (Game, "draw_ui", "draw_ui"),
+        (Game, "draw_minimap", "draw_minimap")
+    ]
+
+    def __init__(self, frames: int, warmup: int,
+    render_mode: str="surface", dynamic_resolution: bool=False,
+    depth: int | None=None, workers: int=1, level: int | None=None,
+    floor_mode: str="textured", idle: bool=False,
+    frame_rate: float=60, chase_speed: float=0) -> None:
+        self.frames = frames
+        self.idle = idle
+        self.frame_seconds: float = 1 / frame_rate
+        self.warmup = warmup
+        self.timings: dict[str, list[float]] = {
+            label: [] for _, _, label in self.subsystems
+        }
+        self.frame_timings: list[float] = []
+        self.originals: list[tuple[type, str, callable]] = []
+        if not depth is None: MapObject.depth = depth
+
+        self.game: Game = Game()
+        self.game.player.render_mode = render_mode
+        self.game.player.floor_mode = floor_mode
+        self.game.dynamic_resolution = dynamic_resolution
+        self.game.player.set_workers(workers)
+        self.game.set_chase_speed("ghost", chase_speed)
+        self.workers: int = self.game.player.ray_caster.get_worker_count()
+
+        if not level is None:
+            self.game.resolution.level = level
+            self.game.apply_resolution()
+
+
+    def instrument(self) -> None:
+        for cls, name, label in self.subsystems:
+            original: callable = getattr(cls, name)
+            self.originals.append((cls, name, original))
+            setattr(cls, name, self.wrap(original, label))
+
+
+    def restore(self) -> None:
+        while len(self.originals) > 0:
+            cls, name, original = self.originals.pop()
+            setattr(cls, name, original)
+
+
+    def wrap(self, func: callable, label: str) -> callable:
+        totals: dict[str, float] = self.totals
+
+        def timed(*args, **kwargs):
+            start: float = perf_counter()
+            result = func(*args, **kwargs)
+            totals[label] += perf_counter() - start
+            return result
+
+        return timed
+
+
+    def get_actions(self, frame: int) -> tuple[str, ...]:
+        if self.idle: return ()
+
+        period: int = sum(length for length, _ in self.script)
+        frame %= period
+
+        for length, actions in self.script:
+            if frame < length: return actions
+            frame -= length
+
+        return ()
+
+
+    def step(self, frame: int) -> None:
+        game: Game = self.game
+        actions: tuple[str, ...] = self.get_actions(frame)
+
+        for key in game.player.actions.keys():
+            game.player.actions[key] = key in actions
+
+        game.ticks += 1
+        for event in pg.event.get():
+            game.handle_event(event)
+
+        for _ in range(game.game_clock.advance(self.frame_seconds)):
+            game.update()
+        game.draw()
+        game.present()
+
+
+    def run(self) -> dict:
+        self.totals: dict[str, float] = {label: 0 for label in self.timings}
+        self.instrument()
+
+        try:
+            for frame in range(self.warmup + self.frames):
+                for label in self.totals:
+                    self.totals[label] = 0
+
+                start: float = perf_counter()
+                self.step(frame)
+                elapsed: float = perf_counter() - start
+
+                self.game.update_resolution(elapsed * 1000)
+                if frame < self.warmup: continue
+
+                self.frame_timings.append(elapsed * 1000)
+                for label, total in self.totals.items():
+                    self.timings[label].append(total * 1000)
+        finally:
+            self.restore()
+            self.game.player.close()
+            self.game.flow_field.close()
+
+        return self.get_report()
+
+
+    def get_stats(self, timings: list[float]) -> dict[str, float]:
+        arr: np.ndarray = np.array(timings)
+
+        return {
+            "mean": round(float(arr.mean()), 4),
+            "p50": round(float(np.percentile(arr, 50)), 4),
+            "p95": round(float(np.percentile(arr, 95)), 4),
+            "p99": round(float(np.percentile(arr, 99)), 4)
+        }
+
+
+    def get_report(self) -> dict:
+        total: float = sum(self.frame_timings)
+        subsystems: dict[str, dict[str, float]] = {}
+
+        for label, timings in self.timings.items():
+            subsystems[label] = self.get_stats(timings)
+            subsystems[label]["share"] = round(sum(timings) / total, 4)
+
+        return {
+            "frames": self.frames,
+            "warmup": self.warmup,
+            "frame_ms": self.get_stats(self.frame_timings),
+            "subsystems_ms": subsystems,
+            "depth": MapObject.depth,
+            "workers": self.workers,
+            "floor_mode": self.game.player.floor_mode,
+            "idle": self.idle,
+            "frame_rate": round(1 / self.frame_seconds, 4),
+            "flow_field_builds": self.game.flow_field.builds,
+            "resolution": self.game.resolution.get_telemetry()
+        }
+
+
+def run_scaling(args: argparse.Namespace) -> dict:
+    results: list[dict] = []
+
+    for workers in range(1, args.workers + 1):
+        report: dict = Benchmark(
+            args.frames, args.warmup, args.render_mode,
+            args.dynamic_resolution, args.depth, workers, args.level,
+            args.floor_mode, False, args.frame_rate
+        ).run()
+
+        results.append({
+            "workers": report["workers"],
+            "frame_ms": report["frame_ms"]["mean"],
+            "update_rays_ms": report["subsystems_ms"][
+                "Camera.update_rays"
+            ]["mean"]
+        })
+
+    base: float = results[0]["update_rays_ms"]
+    for result in results:
+        result["speedup"] = round(base / result["update_rays_ms"], 4)
+
+    return {
+        "frames": args.frames,
+        "ray_count": report["resolution"]["ray_count"],
+        "depth": report["depth"],
+        "cpu_count": os.cpu_count(),
+        "scaling": results
+    }
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Run the game headless and report frame timings."
+    )
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--output", type=str, default=None)
+    parser.add_argument(
+        "--render-mode", choices=("surface", "pixels"), default="surface"
+    )
+    parser.add_argument(
+        "--floor-mode", choices=("textured", "gradient"), default="textured"
+    )
+    parser.add_argument("--dynamic-resolution", action="store_true")
+    parser.add_argument("--depth", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--level", type=int, default=None)
+    parser.add_argument("--scaling", action="store_true")
+    parser.add_argument("--idle", action="store_true")
+    parser.add_argument("--frame-rate", type=float, default=60)
+    parser.add_argument("--chase-speed", type=float, default=0)
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.scaling:
+        report: dict = run_scaling(args)
+    else:
+        report: dict = Benchmark(
+            args.frames, args.warmup, args.render_mode,
+            args.dynamic_resolution, args.depth, args.workers, args.level,
+            args.floor_mode, args.idle, args.frame_rate, args.chase_speed
+        ).run()
+    text: str = json.dumps(report, indent=4)
+
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w") as file:
+            file.write(text)
+
+    pg.quit()
+    sys.exit()
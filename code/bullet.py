@@ -2,7 +2,6 @@ import pygame as pg
 import math
 from tile_map import TileMap
 from entity import Entity
-from camera import Camera
 
 class Bullet(Entity):
 
@@ -13,13 +12,17 @@ class Bullet(Entity):
         self.height = 12
 
         self.speed = 1.5
+        self.reset(x, y, angle)
+
+
+    def reset(self, x: float, y: float, angle: float) -> None:
+        self.x = x
+        self.y = y
         self.angle = angle
         self.vel_x = math.cos(self.angle) * self.speed
         self.vel_y = math.sin(self.angle) * self.speed
+        self.save_state()
 
 
-    def update(self, cam: Camera) -> bool:
-        collision: bool = self.move()
-        self.calculate_3d(cam)
-
-        return collision
\ No newline at end of file
+    def update(self) -> bool:
+        return self.move()
\ No newline at end of file
@@ -0,0 +1,240 @@
+import math
+import numpy as np
+from tile_map import TileMap
+from bullet import Bullet
+from entity_store import EntityStore
+from spatial_hash import SpatialHash
+from ray_caster import RayCaster, RayHits
+
+class BulletPool:
+
+    def get_groups(key_x: np.ndarray,
+    key_y: np.ndarray) -> list[tuple[int, int, np.ndarray]]:
+        if len(key_x) == 0: return []
+
+        min_x: int = int(key_x.min())
+        min_y: int = int(key_y.min())
+        rows: int = int(key_y.max()) - min_y + 1
+        keys: np.ndarray = (key_x - min_x) * rows + (key_y - min_y)
+
+        order: np.ndarray = np.argsort(keys, kind="stable")
+        sorted_keys: np.ndarray = keys[order]
+        starts: np.ndarray = np.flatnonzero(
+            np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1]))
+        )
+        ends: np.ndarray = np.append(starts[1:], len(keys))
+
+        return [
+            (
+                int(sorted_keys[start]) // rows + min_x,
+                int(sorted_keys[start]) % rows + min_y,
+                order[start:end]
+            )
+            for start, end in zip(starts, ends)
+        ]
+
+
+    def sweep_walls(tile_map: TileMap, x: np.ndarray, y: np.ndarray,
+    vel_x: np.ndarray, vel_y: np.ndarray,
+    cluster_size: int | None=None) -> np.ndarray:
+        if cluster_size is None:
+            cluster_size = getattr(tile_map, "chunk_size", 64)
+
+        wall_t: np.ndarray = np.full(len(x), np.inf)
+        span: int = tile_map.tile_size * cluster_size
+        clusters: list[tuple[int, int, np.ndarray]] = BulletPool.get_groups(
+            np.floor(x / span).astype(np.int64),
+            np.floor(y / span).astype(np.int64)
+        )
+
+        for _, _, members in clusters:
+            wall_t[members] = BulletPool.sweep_cluster(
+                tile_map, x[members], y[members],
+                vel_x[members], vel_y[members]
+            )
+
+        return wall_t
+
+
+    def sweep_cluster(tile_map: TileMap, x: np.ndarray, y: np.ndarray,
+    vel_x: np.ndarray, vel_y: np.ndarray) -> np.ndarray:
+        tile_size: int = tile_map.tile_size
+        speed: np.ndarray = np.hypot(vel_x, vel_y)
+        blocked: np.ndarray = ~tile_map.get_free_mask(
+            np.floor((x + vel_x) / tile_size).astype(np.int64),
+            np.floor((y + vel_y) / tile_size).astype(np.int64)
+        )
+
+        depth: int = math.ceil(float(speed.max()) / tile_size) + 1
+        x0: float = float(np.minimum(x, x + vel_x).min()) / tile_size
+        y0: float = float(np.minimum(y, y + vel_y).min()) / tile_size
+        x1: float = float(np.maximum(x, x + vel_x).max()) / tile_size
+        y1: float = float(np.maximum(y, y + vel_y).max()) / tile_size
+        grid, origin_x, origin_y = tile_map.get_window(
+            (x0 + x1) / 2, (y0 + y1) / 2,
+            math.ceil(max(x1 - x0, y1 - y0) / 2) + depth + 1
+        )
+
+        hits: RayHits = RayHits(x, y, np.arctan2(vel_y, vel_x) % math.tau)
+        RayCaster.cast_grid(
+            hits, grid, None, False, (origin_x, origin_y), tile_size, depth
+        )
+
+        wall_t: np.ndarray = np.full(len(x), np.inf)
+        moving: np.ndarray = hits.has_int & (speed > 0)
+        wall_t[moving] = hits.dist[moving] / speed[moving]
+        wall_t[wall_t > 1] = np.inf
+        wall_t[blocked] = np.minimum(wall_t[blocked], 1)
+        return wall_t
+
+
+    def get_entry_times(x: np.ndarray, y: np.ndarray, vel_x: np.ndarray,
+    vel_y: np.ndarray, size: tuple[float, float], box_x: np.ndarray,
+    box_y: np.ndarray, box_size: tuple[float, float]) -> np.ndarray:
+        bounds: list[tuple[np.ndarray, np.ndarray]] = []
+        axes: list[tuple[np.ndarray, np.ndarray, np.ndarray, float]] = [
+            (x, vel_x, box_x, (size[0] + box_size[0]) / 2),
+            (y, vel_y, box_y, (size[1] + box_size[1]) / 2)
+        ]
+
+        for start, vel, box, reach in axes:
+            still: np.ndarray = vel == 0
+            inside: np.ndarray = np.abs(box - start) < reach
+            speed: np.ndarray = np.where(still, 1, vel)
+
+            near: np.ndarray = (box - start - reach) / speed
+            far: np.ndarray = (box - start + reach) / speed
+            enter: np.ndarray = np.where(
+                still, np.where(inside, -np.inf, np.inf), np.minimum(near, far)
+            )
+            leave: np.ndarray = np.where(
+                still, np.where(inside, np.inf, -np.inf), np.maximum(near, far)
+            )
+            bounds.append((enter, leave))
+
+        enter: np.ndarray = np.maximum(bounds[0][0], bounds[1][0])
+        leave: np.ndarray = np.minimum(bounds[0][1], bounds[1][1])
+        return np.where(
+            (enter < leave) & (leave > 0) & (enter <= 1),
+            np.maximum(enter, 0), np.inf
+        )
+
+
+    def get_entity_hits(spatial_hash: SpatialHash, x: np.ndarray,
+    y: np.ndarray, vel_x: np.ndarray, vel_y: np.ndarray, width: np.ndarray,
+    height: np.ndarray) -> np.ndarray:
+        cell_size: int = spatial_hash.cell_size
+        center_x: np.ndarray = x + vel_x / 2
+        center_y: np.ndarray = y + vel_y / 2
+        reach_x: np.ndarray = (width + np.abs(vel_x)) / 2
+        reach_y: np.ndarray = (height + np.abs(vel_y)) / 2
+
+        x0: np.ndarray = np.floor((center_x - reach_x) / cell_size)
+        y0: np.ndarray = np.floor((center_y - reach_y) / cell_size)
+        span_x: np.ndarray = (
+            np.floor((center_x + reach_x) / cell_size) - x0 + 1
+        ).astype(np.int64)
+        span_y: np.ndarray = (
+            np.floor((center_y + reach_y) / cell_size) - y0 + 1
+        ).astype(np.int64)
+
+        counts: np.ndarray = span_x * span_y
+        owners: np.ndarray = np.repeat(np.arange(len(x)), counts)
+        local: np.ndarray = (
+            np.arange(len(owners)) - np.repeat(np.cumsum(counts) - counts, counts)
+        )
+        cells: list[tuple[int, int, np.ndarray]] = BulletPool.get_groups(
+            x0.astype(np.int64)[owners] + local % span_x[owners],
+            y0.astype(np.int64)[owners] + local // span_x[owners]
+        )
+
+        pair_bullets: list[np.ndarray] = []
+        pair_boxes: list[np.ndarray] = []
+        for cx, cy, members in cells:
+            bucket: set | None = spatial_hash.cells.get((cx, cy))
+            if bucket is None: continue
+
+            boxes: np.ndarray = np.array([
+                (entity.x, entity.y, entity.width, entity.height)
+                for entity in bucket
+            ], dtype=np.float64)
+            bullets: np.ndarray = owners[members]
+            pair_bullets.append(np.repeat(bullets, len(boxes)))
+            pair_boxes.append(np.tile(boxes, (len(bullets), 1)))
+
+        hit_t: np.ndarray = np.full(len(x), np.inf)
+        if len(pair_bullets) == 0: return hit_t
+
+        bullets: np.ndarray = np.concatenate(pair_bullets)
+        boxes: np.ndarray = np.concatenate(pair_boxes)
+        times: np.ndarray = BulletPool.get_entry_times(
+            x[bullets], y[bullets], vel_x[bullets], vel_y[bullets],
+            (width[bullets], height[bullets]), boxes[:, 0], boxes[:, 1],
+            (boxes[:, 2], boxes[:, 3])
+        )
+        np.minimum.at(hit_t, bullets, times)
+        return hit_t
+
+
+    def __init__(self, tile_map: TileMap, capacity: int=16) -> None:
+        self.tile_map = tile_map
+        self.store: EntityStore = EntityStore(self.tile_map, capacity)
+        self.active: list[Bullet] = self.store.handles
+        self.free: list[Bullet] = []
+        self.size: int = 0
+        self.grow(capacity)
+
+
+    def grow(self, count: int) -> None:
+        for _ in range(max(count, 1)):
+            self.free.append(Bullet(0, 0, self.tile_map, 0))
+        self.size += max(count, 1)
+
+
+    def spawn(self, x: float, y: float, angle: float) -> Bullet:
+        if len(self.free) == 0: self.grow(self.size)
+
+        bullet: Bullet = self.free.pop()
+        bullet.reset(x, y, angle)
+        self.store.add(bullet)
+        return bullet
+
+
+    def release(self, bullet: Bullet) -> None:
+        self.store.remove(bullet)
+        self.free.append(bullet)
+
+
+    def clear(self) -> None:
+        while len(self.active) > 0:
+            self.release(self.active[-1])
+
+
+    def update(self, spatial_hash: SpatialHash | None=None) -> int:
+        if len(self.active) == 0: return 0
+
+        x: np.ndarray = self.store.get("x")
+        y: np.ndarray = self.store.get("y")
+        vel_x: np.ndarray = self.store.get("vel_x")
+        vel_y: np.ndarray = self.store.get("vel_y")
+        width: np.ndarray = self.store.get("width")
+        height: np.ndarray = self.store.get("height")
+
+        wall_t: np.ndarray = BulletPool.sweep_walls(
+            self.tile_map, x, y, vel_x, vel_y
+        )
+        hit_t: np.ndarray = np.full(len(x), np.inf)
+        if not spatial_hash is None:
+            hit_t = BulletPool.get_entity_hits(
+                spatial_hash, x, y, vel_x, vel_y, width, height
+            )
+
+        hit: np.ndarray = np.isfinite(hit_t) & (hit_t <= wall_t)
+        dead: np.ndarray = hit | (wall_t <= 1)
+        x += vel_x
+        y += vel_y
+
+        for i in np.flatnonzero(dead)[::-1]:
+            self.release(self.active[i])
+
+        return int(hit.sum())
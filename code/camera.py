@@ -1,7 +1,13 @@
 import pygame as pg
 import math
+import numpy as np
 from ray import Ray
+from ray_caster import RayCaster, RayHits
+from parallel_caster import ParallelRayCaster
+from wall_renderer import WallRenderer
+from floor_renderer import FloorRenderer
 from tile_map import TileMap
+from map_object import MapObject
 
 class Camera:
 
@@ -13,131 +19,331 @@ class Camera:
 
         self.angle: float = 0
         self.fov: float = math.pi / 2
-        self.ray_count: int = 128
+        self.ray_count: int = 0
         self.rays: list[Ray] = []
+        self.ray_pool: list[Ray] = []
 
-        for i in range(self.ray_count):
-            t: float = i / (self.ray_count - 1)
-            angle: float = self.angle + t * self.fov - self.fov / 2
-            ray: Ray = Ray(self.x, self.y, angle, self.tile_map)
-            ray.i = i
-            self.rays.append(ray)
+        self.ray_caster: RayCaster = RayCaster(self.tile_map)
+        self.hits: RayHits | None = None
+        self.render_mode: str = "surface"
+        self.wall_renderer: WallRenderer | None = None
+        self.floor_mode: str = "textured"
+        self.floor_renderer: FloorRenderer | None = None
 
+        self.rays_key: tuple | None = None
+        self.cast_count: int = 0
+        self.wall_key: tuple | None = None
+        self.walls_redrawn: bool = False
+        self.wall_layer: pg.Surface | None = None
+        self.sprite_states: list[tuple] = []
 
-    def update_rays(self) -> None:
-        for i in range(self.ray_count):
-            ray: Ray = self.rays[i]
-            t: float = i / (self.ray_count - 1)
-            angle: float = (
-                self.angle + t * self.fov - self.fov / 2
+        self.set_resolution(128)
+
+
+    def set_resolution(self, ray_count: int) -> None:
+        if ray_count == self.ray_count: return
+
+        while len(self.ray_pool) < ray_count:
+            self.ray_pool.append(
+                Ray(self.x, self.y, self.angle, self.tile_map, False)
             )
 
-            if angle >= math.tau:
-                angle -= math.tau
-            if angle < 0:
-                angle += math.tau
+        self.ray_count = ray_count
+        self.rays = self.ray_pool[:ray_count]
+        for i in range(ray_count):
+            self.rays[i].i = i
 
-            ray.set_angle(angle)
-            ray.set_xy(self.x, self.y)
-            ray.update()
-            ray.update_plane_dist(self.angle)
+        self.build_tables()
 
 
-    def is_point_in_fov(self, x: float, y: float) -> bool:
-        x -= self.x
-        y -= self.y
+    def set_fov(self, fov: float) -> None:
+        if fov == self.fov: return
 
-        left_ray: Ray = self.rays[0]
-        right_ray: Ray = self.rays[-1]
+        self.fov = fov
+        self.build_tables()
 
-        xl = x * left_ray.sign_v
-        yl = y * left_ray.sign_v
-        xr = x * right_ray.sign_v
-        yr = y * right_ray.sign_v
 
-        return (
-            left_ray.slope * xl < yl and
-            right_ray.slope * xr > yr
+    def build_tables(self) -> None:
+        self.ray_offsets: np.ndarray = np.linspace(
+            -self.fov / 2, self.fov / 2, self.ray_count
         )
+        self.column_cos: np.ndarray = np.cos(self.ray_offsets)
+        self.column_sin: np.ndarray = np.sin(self.ray_offsets)
+        self.plane_dists: np.ndarray = np.full(self.ray_count, np.inf)
+        self.hits = None
+        self.update_basis()
 
 
-    def get_camera_edges(self, x: float,
-    y: float) -> tuple[float, float, float, float]:
-        x -= self.x
-        y -= self.y
+    def set_workers(self, workers: int) -> None:
+        self.hits = None
+        self.wall_renderer = None
+        self.ray_caster.close()
 
-        left_ray: Ray = self.rays[0]
-        right_ray: Ray = self.rays[-1]
-        parallel_slope: float = math.tan(self.angle + math.pi / 2)
+        if workers > 1:
+            self.ray_caster = ParallelRayCaster(self.tile_map, workers)
+        else:
+            self.ray_caster = RayCaster(self.tile_map)
 
-        a: float = (x * parallel_slope - y)
-        x_n: float = a / (parallel_slope - left_ray.slope)
-        x_m: float = a / (parallel_slope - right_ray.slope)
-        y_n: float = x_n * left_ray.slope
-        y_m: float = x_m * right_ray.slope
 
-        return (x_n, x_m, y_m, y_n)
-    
+    def close(self) -> None:
+        self.hits = None
+        self.ray_caster.close()
 
-    def get_point_screen_pos(self, x: float, y: float, 
-    edges: tuple[float, float, float, float]) -> float | None:
-        if not self.is_point_in_fov(x, y): return None
 
-        x -= self.x
-        y -= self.y
+    def update_rays(self) -> None:
+        self.update_basis()
+        self.ray_dir_x: np.ndarray = (
+            self.forward[0] * self.column_cos + self.right[0] * self.column_sin
+        )
+        self.ray_dir_y: np.ndarray = (
+            self.forward[1] * self.column_cos + self.right[1] * self.column_sin
+        )
 
-        x_n, x_m, y_m, y_n = edges
+        angles: np.ndarray = (self.angle + self.ray_offsets) % math.tau
+        self.hits = self.ray_caster.cast(self.x, self.y, angles)
+        self.plane_dists = np.where(
+            self.hits.has_int, self.hits.dist * self.column_cos, np.inf
+        )
 
-        if ((self.angle >= math.pi / 4
-        and self.angle < math.pi * 3 / 4) or 
-        (self.angle >= math.pi * 5 / 4
-        and self.angle < math.pi * 7 / 4)):
-            t: float = (x - x_m) / (x_n - x_m)
+        if self.render_mode == "surface":
+            for i in range(self.ray_count):
+                self.rays[i].set_hit(self.hits, i, self.angle)
         else:
-            t: float = (y - y_m) / (y_n - y_m)
+            self.rays[0].set_hit(self.hits, 0, self.angle)
+            self.rays[-1].set_hit(self.hits, self.ray_count - 1, self.angle)
+
+        for ray in (self.rays[0], self.rays[-1]):
+            ray.update_angle()
+            ray.update_position()
+
+        self.rays_key = self.get_rays_key()
+        self.cast_count += 1
+
+
+    def get_rays_key(self) -> tuple:
+        return (
+            self.x, self.y, self.angle, self.tile_map.revision,
+            MapObject.depth, self.render_mode
+        )
+
+
+    def refresh_rays(self) -> bool:
+        if not self.hits is None and self.rays_key == self.get_rays_key():
+            return False
+
+        self.update_rays()
+        return True
+
 
-        return 1 - t
-        
+    def invalidate(self) -> None:
+        self.wall_key = None
 
-    def get_point_plane_dist(self, x: float, y: float, 
-    edges: tuple[float, float, float, float]) -> float | None:
-        if not self.is_point_in_fov(x, y): return None
 
-        x -= self.x
-        y -= self.y
+    def update_basis(self) -> None:
+        self.forward: tuple[float, float] = (
+            math.cos(self.angle), math.sin(self.angle)
+        )
+        self.right: tuple[float, float] = (-self.forward[1], self.forward[0])
+        self.half_width: float = math.tan(self.fov / 2)
+        self.far_dist: float = self.tile_size * MapObject.depth
+
+
+    def project(self, x: np.ndarray,
+    y: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        rel_x: np.ndarray = np.asarray(x, dtype=np.float64) - self.x
+        rel_y: np.ndarray = np.asarray(y, dtype=np.float64) - self.y
 
-        x_n, x_m, y_m, y_n = edges
-        d_n: float = x_n**2 + y_n**2
+        depth: np.ndarray = rel_x * self.forward[0] + rel_y * self.forward[1]
+        lateral: np.ndarray = rel_x * self.right[0] + rel_y * self.right[1]
+        extent: np.ndarray = depth * self.half_width
 
-        return math.sqrt(
-            d_n - ((x_m - x_n) / 2)**2 -
-            ((y_m - y_n) / 2)**2
+        in_view: np.ndarray = (
+            (depth > 0) & (depth < self.far_dist) & (np.abs(lateral) < extent)
         )
-        
+        screen_x: np.ndarray = 0.5 + np.divide(
+            lateral, 2 * extent, out=np.zeros_like(lateral), where=depth > 0
+        )
+        return depth, screen_x, in_view
+
+
+    def project_point(self, x: float,
+    y: float) -> tuple[float, float] | None:
+        rel_x: float = x - self.x
+        rel_y: float = y - self.y
+
+        depth: float = rel_x * self.forward[0] + rel_y * self.forward[1]
+        if depth <= 0 or depth >= self.far_dist: return None
+
+        lateral: float = rel_x * self.right[0] + rel_y * self.right[1]
+        extent: float = depth * self.half_width
+        if abs(lateral) >= extent: return None
+
+        return depth, 0.5 + lateral / (2 * extent)
+
+
+    def get_horizon(self, height: int) -> float:
+        return height / 2
+
+
+    def get_wall_height(self, wall_scale: float, height: int) -> float:
+        return wall_scale * height
+
+
+    def is_point_in_fov(self, x: float, y: float) -> bool:
+        return not self.project_point(x, y) is None
+
+
+    def project_entities(self, entities: list) -> None:
+        if len(entities) == 0: return
+
+        count: int = len(entities)
+        x: np.ndarray = np.fromiter((e.x for e in entities), float, count)
+        y: np.ndarray = np.fromiter((e.y for e in entities), float, count)
+        depth, screen_x, in_view = self.project(x, y)
+
+        for entity in entities:
+            entity.set_projection(None, None)
+        for i in np.flatnonzero(in_view):
+            entities[i].set_projection(float(depth[i]), float(screen_x[i]))
+
+
     def draw_rays(self, surf: pg.Surface) -> None:
         self.rays[0].draw(surf)
         self.rays[-1].draw(surf)
 
 
-    def draw_3d(self, surf: pg.Surface, entities: list) -> None:
-        def sort_func(x: any) -> float:
-            if not x.plane_dist is None: return x.plane_dist
-            else: return 0
-
+    def draw_3d(self, surf: pg.Surface, entities: list,
+    background: pg.Surface | None=None) -> bool:
         step_x: int = int(surf.get_width() / self.ray_count)
+        wall_key: tuple = (
+            self.cast_count, surf, surf.get_size(), step_x, self.render_mode,
+            self.floor_mode, background, self.get_floor_key()
+        )
+
+        visible: list = [
+            entity for entity in entities
+            if not entity.plane_dist is None
+        ]
+        visible.sort(key=lambda entity: entity.plane_dist, reverse=True)
+
+        sprites: list[tuple] = []
+        for entity in visible:
+            placed: tuple[pg.Surface, int, int] | None = (
+                entity.get_sprite_pos(surf, self)
+            )
+            if not placed is None: sprites.append((entity, *placed))
+
+        states: list[tuple] = [
+            (id(entity), id(sprite), x, y, entity.plane_dist,
+            sprite.get_width())
+            for entity, sprite, x, y in sprites
+        ]
+
+        self.walls_redrawn = wall_key != self.wall_key
+        if not self.walls_redrawn:
+            if states == self.sprite_states: return False
+            self.redraw_sprites(surf, sprites, states)
+        else:
+            self.draw_wall_layer(surf, step_x, background)
+            self.wall_key = wall_key
+
+            for entity, sprite, x, y in sprites:
+                entity.blit_sprite(surf, sprite, x, y, self.depth_buffer)
+
+        self.sprite_states = states
+        return True
+
+
+    def get_floor_key(self) -> tuple:
+        if self.floor_renderer is None: return (None, 0)
+        return (self.floor_renderer, self.floor_renderer.revision)
+
+
+    def draw_wall_layer(self, surf: pg.Surface, step_x: int,
+    background: pg.Surface | None) -> None:
+        if not background is None and self.floor_mode != "textured":
+            surf.blit(background, (0, 0))
+
+        self.draw_floor(surf, step_x)
+        self.draw_walls(surf, step_x)
+        self.update_depth_buffer(surf.get_width(), step_x)
+
+        if (self.wall_layer is None
+        or self.wall_layer.get_size() != surf.get_size()):
+            self.wall_layer = surf.copy()
+        else:
+            self.wall_layer.blit(surf, (0, 0))
+
+
+    def get_sprite_spans(states: list[tuple], old_states: list[tuple],
+    width: int) -> list[tuple[int, int]]:
+        changed: set[tuple] = set(states).symmetric_difference(old_states)
+        spans: list[tuple[int, int]] = sorted(
+            (max(x, 0), min(x + sprite_width, width))
+            for _, _, x, _, _, sprite_width in changed
+        )
+
+        merged: list[tuple[int, int]] = []
+        for start, end in spans:
+            if start >= end: continue
 
-        sorted_rays: list[Ray] = self.rays.copy()
-        entities = entities.copy()
-        sorted_rays.sort(key=sort_func, reverse=True)
-        entities.sort(key=sort_func, reverse=True)
-
-        for ray in sorted_rays:
-            if len(entities) > 0:
-                if not (entities[0].plane_dist is None
-                or ray.plane_dist is None):
-                    if entities[0].plane_dist > ray.plane_dist:
-                        entities.pop(0).draw_3d(surf)
+            if len(merged) > 0 and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+
+        return merged
+
+
+    def redraw_sprites(self, surf: pg.Surface, sprites: list[tuple],
+    states: list[tuple]) -> None:
+        spans: list[tuple[int, int]] = Camera.get_sprite_spans(
+            states, self.sprite_states, surf.get_width()
+        )
+        height: int = surf.get_height()
+
+        for start, end in spans:
+            area: pg.Rect = pg.Rect(start, 0, end - start, height)
+            surf.blit(self.wall_layer, area, area)
+            surf.set_clip(area)
+
+            for entity, sprite, x, y in sprites:
+                if x >= end or x + sprite.get_width() <= start: continue
+                entity.blit_sprite(surf, sprite, x, y, self.depth_buffer)
+
+        surf.set_clip(None)
+
+
+    def draw_floor(self, surf: pg.Surface, step_x: int) -> None:
+        if self.floor_mode != "textured" or self.hits is None: return
+
+        if self.floor_renderer is None:
+            self.floor_renderer = FloorRenderer(self.tile_map)
+
+        self.floor_renderer.draw(
+            surf, self.x, self.y, self.ray_dir_x, self.ray_dir_y,
+            self.column_cos, step_x
+        )
+
+
+    def draw_walls(self, surf: pg.Surface, step_x: int) -> None:
+        if self.render_mode == "pixels" and not self.hits is None:
+            if self.wall_renderer is None:
+                self.wall_renderer = WallRenderer(self.ray_caster)
+
+            self.wall_renderer.draw(surf, self.hits, self.plane_dists, step_x)
+            return
+
+        for ray in self.rays:
             ray.draw_3d(surf, step_x, ray.i)
 
-        for entity in entities:
-            entity.draw_3d(surf)
\ No newline at end of file
+
+    def update_depth_buffer(self, width: int, step_x: int) -> None:
+        max_dist: float = self.tile_size * MapObject.depth
+        depth: np.ndarray = np.where(
+            self.plane_dists < max_dist, self.plane_dists, np.inf
+        )
+
+        self.depth_buffer: np.ndarray = np.full(width, np.inf)
+        columns: np.ndarray = np.repeat(depth, step_x)[:width]
+        self.depth_buffer[:len(columns)] = columns
@@ -0,0 +1,312 @@
+import pygame as pg
+import numpy as np
+import math
+import mmap
+import struct
+from collections import OrderedDict
+from tile import Tile
+from tile_map import TileMap
+
+class ChunkedTileMap(TileMap):
+    chunk_magic: bytes = b"TCHK"
+    chunk_header: str = "<4sIIIIHI"
+    chunk_dtype: np.dtype = np.dtype("<u2")
+    data_alignment: int = 64
+
+    def create(path: str, map_size: tuple[int, int], tile_size: int,
+    names: list[str], chunk_size: int=64) -> None:
+        header_size: int = struct.calcsize(ChunkedTileMap.chunk_header)
+        encoded: bytes = b"".join(
+            bytes((len(name.encode()),)) + name.encode() for name in names
+        )
+        alignment: int = ChunkedTileMap.data_alignment
+        data_offset: int = math.ceil(
+            (header_size + len(encoded)) / alignment
+        ) * alignment
+
+        chunks_x: int = math.ceil(map_size[0] / chunk_size)
+        chunks_y: int = math.ceil(map_size[1] / chunk_size)
+        chunk_bytes: int = (
+            chunk_size * chunk_size * ChunkedTileMap.chunk_dtype.itemsize
+        )
+
+        with open(path, "wb") as file:
+            file.write(struct.pack(
+                ChunkedTileMap.chunk_header, ChunkedTileMap.chunk_magic,
+                map_size[0], map_size[1], tile_size, chunk_size,
+                len(names) + 1, data_offset
+            ))
+            file.write(encoded)
+            file.truncate(data_offset + chunks_x * chunks_y * chunk_bytes)
+
+
+    def save(path: str, tile_map: TileMap, chunk_size: int=64) -> None:
+        ChunkedTileMap.create(
+            path, tile_map.map_size, tile_map.tile_size,
+            [tile.name for tile in tile_map.palette[1:]], chunk_size
+        )
+        chunked: ChunkedTileMap = ChunkedTileMap(path, writable=True)
+
+        for cy in range(chunked.chunks_y):
+            for cx in range(chunked.chunks_x):
+                cells: np.ndarray = tile_map.grid[
+                    cy * chunk_size:(cy + 1) * chunk_size,
+                    cx * chunk_size:(cx + 1) * chunk_size
+                ]
+                if not cells.any(): continue
+
+                chunk: np.ndarray = np.zeros(
+                    (chunk_size, chunk_size), dtype=ChunkedTileMap.chunk_dtype
+                )
+                chunk[:cells.shape[0], :cells.shape[1]] = cells
+                offset: int = chunked.get_chunk_offset(cx, cy)
+                chunked.mmap[offset:offset + chunked.chunk_bytes] = (
+                    chunk.tobytes()
+                )
+
+        chunked.close()
+
+
+    def __init__(self, path: str, max_chunks: int=64,
+    writable: bool=False) -> None:
+        self.path = path
+        self.max_chunks = max_chunks
+        self.writable = writable
+
+        self.file = open(path, "r+b" if writable else "rb")
+        self.mmap: mmap.mmap = mmap.mmap(
+            self.file.fileno(), 0,
+            access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_COPY
+        )
+
+        magic, width, height, tile_size, chunk_size, palette_size, \
+        self.data_offset = struct.unpack_from(self.chunk_header, self.mmap)
+        if magic != self.chunk_magic:
+            self.close()
+            raise ValueError(f"{path} is not a chunked tile map")
+
+        self.map_size = (width, height)
+        self.tile_size = tile_size
+        self.chunk_size = chunk_size
+        self.chunks_x: int = math.ceil(width / chunk_size)
+        self.chunks_y: int = math.ceil(height / chunk_size)
+        self.chunk_bytes: int = (
+            chunk_size * chunk_size * self.chunk_dtype.itemsize
+        )
+
+        self.palette: list[Tile | None] = [None]
+        self.palette_ids: dict[str, int] = {}
+        offset: int = struct.calcsize(self.chunk_header)
+
+        for _ in range(palette_size - 1):
+            length: int = self.mmap[offset]
+            name: str = self.mmap[offset + 1:offset + 1 + length].decode()
+            self.palette_ids[name] = len(self.palette)
+            self.palette.append(Tile.get(name))
+            offset += 1 + length
+
+        self.chunks: OrderedDict[tuple[int, int], np.ndarray] = OrderedDict()
+        self.windows: OrderedDict[tuple[int, ...], np.ndarray] = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+        self.drawn_chunks: set[tuple[int, int]] = set()
+        self.new_chunks: set[tuple[int, int]] = set()
+        self.init_layer()
+
+
+    def close(self) -> None:
+        self.chunks.clear()
+        self.windows.clear()
+        self.mmap.close()
+        self.file.close()
+
+
+    def get_chunk_offset(self, cx: int, cy: int) -> int:
+        return self.data_offset + (cy * self.chunks_x + cx) * self.chunk_bytes
+
+
+    def get_chunk_view(self, cx: int, cy: int) -> np.ndarray:
+        return np.frombuffer(
+            self.mmap, dtype=self.chunk_dtype,
+            count=self.chunk_size * self.chunk_size,
+            offset=self.get_chunk_offset(cx, cy)
+        ).reshape((self.chunk_size, self.chunk_size))
+
+
+    def get_chunk(self, cx: int, cy: int) -> np.ndarray:
+        key: tuple[int, int] = (cx, cy)
+
+        chunk: np.ndarray | None = self.chunks.get(key)
+        if not chunk is None:
+            self.hits += 1
+            self.chunks.move_to_end(key)
+            return chunk
+
+        self.misses += 1
+        chunk = self.get_chunk_view(cx, cy).astype(np.uint16)
+        self.chunks[key] = chunk
+        if not key in self.drawn_chunks: self.new_chunks.add(key)
+
+        if len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+            self.evictions += 1
+
+        return chunk
+
+
+    def get_tile_id(self, tile: Tile | None) -> int:
+        if tile is None: return 0
+        if tile.name in self.palette_ids: return self.palette_ids[tile.name]
+
+        if self.writable:
+            raise ValueError(f"{tile.name} is not in the map palette")
+        if len(self.palette) > np.iinfo(self.chunk_dtype).max:
+            raise ValueError(f"{self.path} has too many tile types")
+
+        self.palette_ids[tile.name] = len(self.palette)
+        self.palette.append(Tile.get(tile.name))
+        return self.palette_ids[tile.name]
+
+
+    def get_tile(self, x: int, y: int) -> Tile | None:
+        if x < 0 or x >= self.map_size[0] or y < 0 or y >= self.map_size[1]:
+            raise IndexError(f"tile ({x}, {y}) is outside of the map")
+
+        chunk: np.ndarray = self.get_chunk(
+            x // self.chunk_size, y // self.chunk_size
+        )
+        return self.palette[chunk[y % self.chunk_size, x % self.chunk_size]]
+
+
+    def set_tile(self, x: int, y: int, tile: Tile | None) -> None:
+        tile_id: int = self.get_tile_id(tile)
+        cx, lx = divmod(x, self.chunk_size)
+        cy, ly = divmod(y, self.chunk_size)
+
+        chunk: np.ndarray = self.get_chunk(cx, cy)
+        if chunk[ly, lx] == tile_id: return
+
+        chunk[ly, lx] = tile_id
+        struct.pack_into(
+            "<H", self.mmap, self.get_chunk_offset(cx, cy) +
+            (ly * self.chunk_size + lx) * self.chunk_dtype.itemsize, tile_id
+        )
+        self.update_window(x, y, tile_id)
+        self.notify_tile(x, y)
+
+
+    def update_window(self, x: int, y: int, tile_id: int) -> None:
+        for key, window in self.windows.items():
+            wx: int = x - key[0] * self.chunk_size
+            wy: int = y - key[1] * self.chunk_size
+            height, width = window.shape
+            if wx < 0 or wx >= width or wy < 0 or wy >= height: continue
+
+            window[wy, wx] = tile_id
+
+
+    def get_free_mask(self, tile_x: np.ndarray,
+    tile_y: np.ndarray) -> np.ndarray:
+        inside: np.ndarray = (
+            (tile_x >= 0) & (tile_x < self.map_size[0]) &
+            (tile_y >= 0) & (tile_y < self.map_size[1])
+        )
+        keys: np.ndarray = (
+            (tile_y // self.chunk_size) * self.chunks_x +
+            tile_x // self.chunk_size
+        )
+
+        free: np.ndarray = np.zeros(np.shape(tile_x), dtype=bool)
+        for key in np.unique(keys[inside]):
+            cy, cx = divmod(int(key), self.chunks_x)
+            chunk: np.ndarray = self.get_chunk(cx, cy)
+            cells: np.ndarray = inside & (keys == key)
+            free[cells] = chunk[
+                tile_y[cells] % self.chunk_size, tile_x[cells] % self.chunk_size
+            ] == 0
+
+        return free
+
+
+    def get_window(self, x: float, y: float,
+    radius: int) -> tuple[np.ndarray, int, int]:
+        cx0: int = max(math.floor(x - radius) // self.chunk_size, 0)
+        cy0: int = max(math.floor(y - radius) // self.chunk_size, 0)
+        cx1: int = min(math.floor(x + radius) // self.chunk_size,
+            self.chunks_x - 1)
+        cy1: int = min(math.floor(y + radius) // self.chunk_size,
+            self.chunks_y - 1)
+        key: tuple[int, ...] = (cx0, cy0, cx1, cy1)
+
+        origin_x: int = cx0 * self.chunk_size
+        origin_y: int = cy0 * self.chunk_size
+        if key in self.windows:
+            self.windows.move_to_end(key)
+            return self.windows[key], origin_x, origin_y
+
+        size: int = self.chunk_size
+        window: np.ndarray = np.zeros(
+            ((cy1 - cy0 + 1) * size, (cx1 - cx0 + 1) * size), dtype=np.uint16
+        )
+
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                wx: int = (cx - cx0) * size
+                wy: int = (cy - cy0) * size
+                window[wy:wy + size, wx:wx + size] = self.get_chunk(cx, cy)
+
+        self.windows[key] = window[
+            :self.map_size[1] - origin_y, :self.map_size[0] - origin_x
+        ]
+        if len(self.windows) > self.max_windows:
+            self.windows.popitem(last=False)
+
+        return self.windows[key], origin_x, origin_y
+
+
+    def get_layer(self, size: tuple[int, int]) -> pg.Surface:
+        layer: pg.Surface = TileMap.get_layer(self, size)
+
+        for cx, cy in self.new_chunks:
+            self.draw_chunk(layer, cx, cy)
+        self.new_chunks.clear()
+
+        return layer
+
+
+    def draw_tiles(self, surf: pg.Surface) -> None:
+        keys: set[tuple[int, int]] = self.drawn_chunks | self.new_chunks
+        self.drawn_chunks = set()
+        self.new_chunks.clear()
+
+        for cx, cy in keys:
+            self.draw_chunk(surf, cx, cy)
+
+
+    def draw_chunk(self, surf: pg.Surface, cx: int, cy: int) -> None:
+        scale: tuple[float, float] = (
+            surf.get_width() / 512,
+            surf.get_height() / 512,
+        )
+        chunk: np.ndarray | None = self.chunks.get((cx, cy))
+        if chunk is None: chunk = self.get_chunk_view(cx, cy)
+
+        ys, xs = np.nonzero(chunk)
+        for x, y in zip(xs + cx * self.chunk_size, ys + cy * self.chunk_size):
+            pg.draw.rect(surf, self.tile_color, self.get_tile_rect(
+                self.get_idx(int(x), int(y)), scale
+            ))
+
+        self.drawn_chunks.add((cx, cy))
+
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "size": len(self.chunks),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
@@ -0,0 +1,59 @@
+import pygame as pg
+from collections import OrderedDict
+
+class ColumnCache:
+
+    def __init__(self, max_size: int=4096,
+    height_step: int=2, tint_step: int=4) -> None:
+        self.max_size = max_size
+        self.height_step = height_step
+        self.tint_step = tint_step
+        self.columns: OrderedDict[tuple, pg.Surface] = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+
+    def quantize(self, value: float, step: int) -> int:
+        return int(round(value / step)) * step
+
+
+    def get_column(self, name: str, slice_num: int, slice_img: pg.Surface,
+    size: tuple[int, int], tint: int) -> pg.Surface:
+        height: int = max(self.quantize(size[1], self.height_step), 1)
+        tint = min(self.quantize(tint, self.tint_step), 255)
+        key: tuple[str, int, int, int, int] = (
+            name, slice_num, int(size[0]), height, tint
+        )
+
+        column: pg.Surface | None = self.columns.get(key)
+        if not column is None:
+            self.hits += 1
+            self.columns.move_to_end(key)
+            return column
+
+        self.misses += 1
+        column = slice_img.copy()
+        column.fill((tint, tint, tint), special_flags=pg.BLEND_RGB_MULT)
+        column = pg.transform.scale(column, (int(size[0]), height))
+        self.columns[key] = column
+
+        if len(self.columns) > self.max_size:
+            self.columns.popitem(last=False)
+            self.evictions += 1
+
+        return column
+
+
+    def clear(self) -> None:
+        self.columns.clear()
+
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "size": len(self.columns),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
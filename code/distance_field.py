@@ -0,0 +1,69 @@
+import numpy as np
+
+class DistanceField:
+
+    def __init__(self, max_distance: int=16) -> None:
+        self.max_distance = max_distance
+        self.grid: np.ndarray | None = None
+        self.field: np.ndarray | None = None
+        self.max_value: int = 0
+
+
+    def dilate(self, mask: np.ndarray) -> np.ndarray:
+        grown: np.ndarray = mask.copy()
+        grown[1:] |= mask[:-1]
+        grown[:-1] |= mask[1:]
+
+        result: np.ndarray = grown.copy()
+        result[:, 1:] |= grown[:, :-1]
+        result[:, :-1] |= grown[:, 1:]
+        return result
+
+
+    def get_field(self, occupied: np.ndarray) -> np.ndarray:
+        field: np.ndarray = np.full(
+            occupied.shape, self.max_distance, dtype=np.uint8
+        )
+        field[occupied] = 0
+        if not occupied.any(): return field
+        reached: np.ndarray = occupied
+
+        for distance in range(1, self.max_distance):
+            if reached.all(): break
+
+            grown: np.ndarray = self.dilate(reached)
+            field[grown & ~reached] = distance
+            reached = grown
+
+        return field
+
+
+    def build(self, grid: np.ndarray) -> None:
+        self.grid = grid
+        self.field = self.get_field(grid != 0)
+        self.max_value = int(self.field.max(initial=0))
+
+
+    def update(self, x: int, y: int) -> None:
+        if self.grid is None or self.field is None: return
+
+        height, width = self.grid.shape
+        if x < 0 or x >= width or y < 0 or y >= height: return
+
+        reach: int = 2 * self.max_distance
+        x0: int = max(x - reach, 0)
+        y0: int = max(y - reach, 0)
+        field: np.ndarray = self.get_field(
+            self.grid[y0:y + reach + 1, x0:x + reach + 1] != 0
+        )
+
+        ix0: int = max(x - self.max_distance, 0)
+        iy0: int = max(y - self.max_distance, 0)
+        ix1: int = min(x + self.max_distance + 1, width)
+        iy1: int = min(y + self.max_distance + 1, height)
+        self.field[iy0:iy1, ix0:ix1] = field[
+            iy0 - y0:iy1 - y0, ix0 - x0:ix1 - x0
+        ]
+        self.max_value = max(
+            self.max_value, int(self.field[iy0:iy1, ix0:ix1].max())
+        )
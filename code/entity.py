@@ -1,13 +1,27 @@
 import pygame as pg
 import json
+import numpy as np
 import preload
 from camera import Camera
 from tile_map import TileMap
 from map_object import MapObject
 from kinematic_entity import KinematicEntity
+from entity_store import EntityStore, StoreField
+from sprite_cache import SpriteCache
 
 class Entity(MapObject, KinematicEntity):
     sprites: dict[str, pg.Surface] = {}
+    sprite_cache: SpriteCache = SpriteCache()
+    wall_texels: int = 512
+    x: StoreField = StoreField()
+    y: StoreField = StoreField()
+    vel_x: StoreField = StoreField()
+    vel_y: StoreField = StoreField()
+    width: StoreField = StoreField()
+    height: StoreField = StoreField()
+    prev_x: StoreField = StoreField()
+    prev_y: StoreField = StoreField()
+    chase_speed: StoreField = StoreField()
 
     def init() -> None:
         entities: list[str] = []
@@ -15,31 +29,41 @@ class Entity(MapObject, KinematicEntity):
             entities = json.load(file)
 
         for name in entities:
-            Entity.sprites[name] = preload.get_sprites(name)
+            mips: list[pg.Surface] = preload.get_sprite_mips(name)
+            Entity.sprites[name] = mips[0]
+            Entity.sprite_cache.add_sprite(name, mips)
 
 
     def __init__(self, name: str, x: float,
     y: float, tile_map: TileMap) -> None:
+        self.store: EntityStore | None = None
+        self.index: int = -1
         KinematicEntity.__init__(self, x, y, 8, 8, tile_map)
         self.name = name
         self.tile_map = tile_map
+        self.chase_speed = 0
 
 
-    def update(self, cam: Camera) -> None:
+    def update(self) -> None:
         self.move()
-        self.calculate_3d(cam)
+
+
+    def set_chase_speed(self, speed: float) -> None:
+        self.chase_speed = max(speed, 0)
 
 
     def calculate_3d(self, cam: Camera) -> None:
-        self.edges: tuple[float, float, float, float] = (
-            cam.get_camera_edges(self.x, self.y)
-        )
-        self.plane_dist: float | None = (
-            cam.get_point_plane_dist(self.x, self.y, self.edges)
-        )
-        self.cam_pos: float | None = (
-            cam.get_point_screen_pos(self.x, self.y, self.edges)
+        projection: tuple[float, float] | None = cam.project_point(
+            self.x, self.y
         )
+        if projection is None: self.set_projection(None, None)
+        else: self.set_projection(*projection)
+
+
+    def set_projection(self, plane_dist: float | None,
+    cam_pos: float | None) -> None:
+        self.plane_dist: float | None = plane_dist
+        self.cam_pos: float | None = cam_pos
         self.inv_plane_dist: float | None = self.calculate_inv_plane_dist()
 
         if not self.inv_plane_dist is None:
@@ -61,26 +85,55 @@ class Entity(MapObject, KinematicEntity):
         ))
 
 
-    def draw_3d(self, surf: pg.Surface) -> None:
-        if self.cam_pos is None or self.plane_dist is None: return
-        if self.cam_pos > 1 or self.cam_pos < 0: return
-        if self.inv_plane_dist < 0: return
-
-        sprite: pg.Surface = Entity.sprites[self.name]
-        sprite = pg.transform.scale_by(sprite, self.scale)
+    def get_sprite_pos(self, surf: pg.Surface,
+    cam: Camera) -> tuple[pg.Surface, int, int] | None:
+        if self.cam_pos is None or self.plane_dist is None: return None
+        if self.cam_pos > 1 or self.cam_pos < 0: return None
+        if self.inv_plane_dist < 0: return None
 
-        wall_height: float = self.calculate_wall_scale() * surf.get_height()
+        wall_height: float = cam.get_wall_height(self.scale, surf.get_height())
+        tint: int = int(255 * self.inv_plane_dist ** 0.5)
+        sprite: pg.Surface = Entity.sprite_cache.get_sprite(
+            self.name, wall_height / Entity.wall_texels, tint
+        )
 
         x: int = (
             int(surf.get_width() * self.cam_pos)
             - int(sprite.get_width() / 2)
         )
         y: int = int(
-            surf.get_height() / 2 + wall_height / 2 - sprite.get_height()
+            cam.get_horizon(surf.get_height()) + wall_height / 2
+            - sprite.get_height()
         )
+        return sprite, x, y
 
-        tint: int = int(255 * self.inv_plane_dist ** 0.5)
-        tint = tint + (tint << 8) + (tint << 16)
-        sprite.fill(tint, special_flags=pg.BLEND_RGB_MULT)
 
-        surf.blit(sprite, (x, y))
\ No newline at end of file
+    def draw_3d(self, surf: pg.Surface, cam: Camera,
+    depth_buffer: np.ndarray | None=None) -> None:
+        placed: tuple[pg.Surface, int, int] | None = self.get_sprite_pos(
+            surf, cam
+        )
+        if placed is None: return
+        self.blit_sprite(surf, *placed, depth_buffer)
+
+
+    def blit_sprite(self, surf: pg.Surface, sprite: pg.Surface, x: int,
+    y: int, depth_buffer: np.ndarray | None=None) -> None:
+        if depth_buffer is None:
+            surf.blit(sprite, (x, y))
+            return
+
+        x0: int = max(x, 0)
+        x1: int = min(x + sprite.get_width(), surf.get_width())
+        if x0 >= x1: return
+
+        visible: np.ndarray = self.plane_dist < depth_buffer[x0:x1]
+        edges: np.ndarray = np.flatnonzero(np.diff(
+            np.concatenate(([0], visible.astype(np.int8), [0]))
+        ))
+
+        for start, end in zip(edges[0::2], edges[1::2]):
+            area: tuple[int, int, int, int] = (
+                x0 - x + start, 0, end - start, sprite.get_height()
+            )
+            surf.blit(sprite, (x0 + start, y), area)
\ No newline at end of file
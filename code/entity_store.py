@@ -0,0 +1,193 @@
+import numpy as np
+from tile_map import TileMap
+from kinematic_entity import KinematicEntity
+from flow_field import FlowField
+
+class StoreField:
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+
+    def __get__(self, obj: object, owner: type | None=None):
+        if obj is None: return self
+
+        store: EntityStore | None = obj.__dict__.get("store")
+        if store is None: return obj.__dict__[self.name]
+        return store.arrays[self.name][obj.index]
+
+
+    def __set__(self, obj: object, value: float) -> None:
+        store: EntityStore | None = obj.__dict__.get("store")
+        if store is None: obj.__dict__[self.name] = value
+        else: store.arrays[self.name][obj.index] = value
+
+
+class EntityStore:
+    fields: list[str] = [
+        "x", "y", "vel_x", "vel_y", "width", "height", "prev_x", "prev_y",
+        "chase_speed"
+    ]
+
+    def __init__(self, tile_map: TileMap, capacity: int=64,
+    cell_size: int | None=None) -> None:
+        self.tile_map = tile_map
+        self.cell_size: int = (
+            self.tile_map.tile_size if cell_size is None else cell_size
+        )
+        self.count: int = 0
+        self.handles: list = []
+        self.type_names: list[str] = []
+        self.type_ids: dict[str, int] = {}
+
+        self.arrays: dict[str, np.ndarray] = {
+            name: np.zeros(capacity) for name in self.fields
+        }
+        self.type_id: np.ndarray = np.zeros(capacity, dtype=np.int32)
+        self.sim_x: np.ndarray | None = None
+        self.sim_y: np.ndarray | None = None
+
+
+    def get_capacity(self) -> int:
+        return len(self.type_id)
+
+
+    def grow(self, capacity: int) -> None:
+        for name, array in self.arrays.items():
+            grown: np.ndarray = np.zeros(capacity)
+            grown[:self.count] = array[:self.count]
+            self.arrays[name] = grown
+
+        type_id: np.ndarray = np.zeros(capacity, dtype=np.int32)
+        type_id[:self.count] = self.type_id[:self.count]
+        self.type_id = type_id
+
+
+    def get_type_id(self, name: str) -> int:
+        if not name in self.type_ids:
+            self.type_ids[name] = len(self.type_names)
+            self.type_names.append(name)
+
+        return self.type_ids[name]
+
+
+    def get(self, name: str) -> np.ndarray:
+        return self.arrays[name][:self.count]
+
+
+    def add(self, entity) -> None:
+        if not entity.__dict__.get("store") is None:
+            raise ValueError(f"{entity.name} is already in a store")
+
+        if self.count == self.get_capacity():
+            self.grow(max(self.get_capacity() * 2, 1))
+
+        index: int = self.count
+        for name, array in self.arrays.items():
+            array[index] = getattr(entity, name)
+        self.type_id[index] = self.get_type_id(entity.name)
+
+        entity.store = self
+        entity.index = index
+        self.handles.append(entity)
+        self.count += 1
+
+
+    def remove(self, entity) -> None:
+        if not entity.__dict__.get("store") is self: return
+
+        index: int = entity.index
+        values: dict[str, float] = {
+            name: float(array[index]) for name, array in self.arrays.items()
+        }
+        last: int = self.count - 1
+
+        if index != last:
+            for array in self.arrays.values():
+                array[index] = array[last]
+            self.type_id[index] = self.type_id[last]
+
+            moved = self.handles[last]
+            moved.index = index
+            self.handles[index] = moved
+
+        self.handles.pop()
+        self.count -= 1
+
+        entity.store = None
+        entity.__dict__.update(values)
+
+
+    def update(self) -> np.ndarray:
+        x: np.ndarray = self.get("x")
+        y: np.ndarray = self.get("y")
+        vel_x: np.ndarray = self.get("vel_x")
+        vel_y: np.ndarray = self.get("vel_y")
+
+        next_x, next_y, collision = KinematicEntity.move_batch(
+            self.tile_map, x, y, vel_x, vel_y
+        )
+        moved: np.ndarray = np.flatnonzero((next_x != x) | (next_y != y))
+        cells: np.ndarray = self.get_cell_bounds(x, y)
+        x[:] = next_x
+        y[:] = next_y
+        changed: np.ndarray = (cells != self.get_cell_bounds(x, y)).any(axis=0)
+
+        for index in moved:
+            handle = self.handles[index]
+            if handle.spatial_hash is None: continue
+            if changed[index] or handle.spatial_hash.cell_size != self.cell_size:
+                handle.spatial_hash.update(handle)
+
+        return collision
+
+
+    def get_chasers(self) -> np.ndarray:
+        return np.flatnonzero(self.get("chase_speed") > 0)
+
+
+    def steer(self, flow_field: FlowField) -> None:
+        chase_speed: np.ndarray = self.get("chase_speed")
+        chasers: np.ndarray = self.get_chasers()
+        if len(chasers) == 0: return
+
+        dir_x, dir_y = flow_field.get_direction_batch(
+            self.get("x")[chasers], self.get("y")[chasers]
+        )
+        self.get("vel_x")[chasers] = dir_x * chase_speed[chasers]
+        self.get("vel_y")[chasers] = dir_y * chase_speed[chasers]
+
+
+    def get_cell_bounds(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        half_width: np.ndarray = self.get("width") / 2
+        half_height: np.ndarray = self.get("height") / 2
+
+        return np.floor(np.array([
+            x - half_width, y - half_height, x + half_width, y + half_height
+        ]) / self.cell_size)
+
+
+    def save_state(self) -> None:
+        self.get("prev_x")[:] = self.get("x")
+        self.get("prev_y")[:] = self.get("y")
+
+
+    def begin_render(self, alpha: float) -> None:
+        x: np.ndarray = self.get("x")
+        y: np.ndarray = self.get("y")
+        prev_x: np.ndarray = self.get("prev_x")
+        prev_y: np.ndarray = self.get("prev_y")
+
+        self.sim_x = x.copy()
+        self.sim_y = y.copy()
+        x[:] = prev_x + (x - prev_x) * alpha
+        y[:] = prev_y + (y - prev_y) * alpha
+
+
+    def end_render(self) -> None:
+        if self.sim_x is None or self.sim_y is None: return
+
+        self.get("x")[:] = self.sim_x
+        self.get("y")[:] = self.sim_y
+        self.sim_x = None
+        self.sim_y = None
@@ -0,0 +1,149 @@
+import pygame as pg
+import numpy as np
+from tile_map import TileMap
+from map_object import MapObject
+from wall_renderer import WallRenderer
+
+class FloorRenderer:
+
+    def __init__(self, tile_map: TileMap, floor: str="block",
+    ceiling: str="brick", shade_levels: int=64) -> None:
+        self.tile_map = tile_map
+        self.tile_size = self.tile_map.tile_size
+        self.shade_levels = shade_levels
+        self.revision: int = 0
+        self.names: list[str] = []
+        self.floor_id: int = self.get_texture_id(floor)
+        self.ceiling_id: int = self.get_texture_id(ceiling)
+
+        self.floor_ids: np.ndarray | None = None
+        self.ceiling_ids: np.ndarray | None = None
+
+        self.textures: np.ndarray | None = None
+        self.shifts: tuple[int, ...] | None = None
+        self.row_height: int = 0
+
+
+    def get_texture_id(self, name: str) -> int:
+        if not name in self.names:
+            self.names.append(name)
+            self.textures = None
+
+        return self.names.index(name)
+
+
+    def set_tile_textures(self, x: int, y: int, floor: str | None=None,
+    ceiling: str | None=None) -> None:
+        if self.floor_ids is None:
+            grid: np.ndarray | None = getattr(self.tile_map, "grid", None)
+            if grid is None:
+                raise ValueError("per-tile floors need a dense tile map")
+
+            self.floor_ids = np.full(grid.shape, self.floor_id, dtype=np.uint8)
+            self.ceiling_ids = np.full(
+                grid.shape, self.ceiling_id, dtype=np.uint8
+            )
+
+        if not floor is None: self.floor_ids[y, x] = self.get_texture_id(floor)
+        if not ceiling is None:
+            self.ceiling_ids[y, x] = self.get_texture_id(ceiling)
+        self.revision += 1
+
+
+    def update_textures(self, surf: pg.Surface) -> None:
+        if self.textures is None:
+            self.textures = WallRenderer.get_texture_array(self.names)
+            self.texture_size: tuple[int, int] = self.textures.shape[1:3]
+            self.shifts = None
+
+        if self.shifts == surf.get_shifts(): return
+
+        self.shifts = surf.get_shifts()
+        self.shaded_textures: np.ndarray = WallRenderer.get_shaded_textures(
+            self.textures, self.shade_levels, self.shifts
+        )
+
+
+    def update_rows(self, height: int) -> None:
+        if height == self.row_height: return
+
+        self.row_height = height
+        rows: np.ndarray = np.arange(height // 2, height)
+        screen_y: np.ndarray = 2 * (rows + 0.5) / height - 1
+        inv_sq: np.ndarray = (
+            (screen_y - MapObject.min_height) / MapObject.height_diff
+        )
+        visible: np.ndarray = inv_sq > 0
+
+        inv_dist: np.ndarray = np.sqrt(np.clip(inv_sq[visible], 0, 1))
+        self.rows: np.ndarray = rows[visible]
+        self.hidden_rows: np.ndarray = rows[~visible]
+        self.row_dists: np.ndarray = (
+            (1 - inv_dist) * self.tile_size * MapObject.depth
+        )
+        self.row_shades: np.ndarray = np.round(
+            inv_dist * (self.shade_levels - 1)
+        ).astype(np.int32)
+
+
+    def get_tile_index(self, tile_x: np.ndarray,
+    tile_y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        height, width = self.floor_ids.shape
+        inside: np.ndarray = (
+            (tile_x >= 0) & (tile_x < width) & (tile_y >= 0) & (tile_y < height)
+        )
+        index: np.ndarray = (
+            np.clip(tile_y, 0, height - 1) * width + np.clip(tile_x, 0, width - 1)
+        )
+        return index, inside
+
+
+    def draw(self, surf: pg.Surface, x: float, y: float, dir_x: np.ndarray,
+    dir_y: np.ndarray, column_cos: np.ndarray, step_x: int) -> None:
+        self.update_textures(surf)
+        width, height = surf.get_size()
+        self.update_rows(height)
+
+        columns: int = min(len(dir_x) * step_x, width)
+        pixels: np.ndarray = pg.surfarray.pixels2d(surf)
+        pixels[:columns, self.hidden_rows] = 0
+        pixels[:columns, height - 1 - self.hidden_rows] = 0
+
+        if len(self.rows) == 0:
+            del pixels
+            return
+
+        dists: np.ndarray = self.row_dists[:, np.newaxis]
+        world_x: np.ndarray = (x + dists * (dir_x / column_cos)) / self.tile_size
+        world_y: np.ndarray = (y + dists * (dir_y / column_cos)) / self.tile_size
+        tile_x: np.ndarray = np.floor(world_x).astype(np.int64)
+        tile_y: np.ndarray = np.floor(world_y).astype(np.int64)
+
+        tex_w, tex_h = self.texture_size
+        tex_x: np.ndarray = np.minimum(
+            ((world_x - tile_x) * tex_w).astype(np.int32), tex_w - 1
+        )
+        tex_y: np.ndarray = np.minimum(
+            ((world_y - tile_y) * tex_h).astype(np.int32), tex_h - 1
+        )
+        offset: np.ndarray = tex_x * tex_h + tex_y
+        shade: np.ndarray = self.row_shades[:, np.newaxis]
+
+        textures: list[np.ndarray | int] = [self.floor_id, self.ceiling_id]
+        if not self.floor_ids is None:
+            index, inside = self.get_tile_index(tile_x, tile_y)
+            textures = [
+                np.where(inside, ids.ravel()[index], default)
+                for ids, default in (
+                    (self.floor_ids, self.floor_id),
+                    (self.ceiling_ids, self.ceiling_id)
+                )
+            ]
+
+        for texture, rows in zip(textures, (self.rows, height - 1 - self.rows)):
+            texels: np.ndarray = self.shaded_textures[
+                (texture * self.shade_levels + shade) * (tex_w * tex_h) + offset
+            ]
+            pixels[:columns, rows] = np.repeat(texels.T, step_x, axis=0)[:columns]
+
+        del pixels
@@ -0,0 +1,196 @@
+import math
+import numpy as np
+from tile_map import TileMap
+
+class FlowField:
+    offsets: list[tuple[int, int]] = [
+        (1, 0), (-1, 0), (0, 1), (0, -1),
+        (1, 1), (1, -1), (-1, 1), (-1, -1)
+    ]
+
+    def get_distances(free: np.ndarray, target_x: int,
+    target_y: int) -> np.ndarray:
+        height, width = free.shape
+        distances: np.ndarray = np.full(free.shape, -1, dtype=np.int32)
+        if (target_x < 0 or target_x >= width or target_y < 0
+        or target_y >= height or not free[target_y, target_x]):
+            return distances
+
+        stride: int = width + 2
+        padded: np.ndarray = np.zeros((height + 2, stride), dtype=bool)
+        padded[1:-1, 1:-1] = free
+        unvisited: np.ndarray = padded.ravel()
+        found: np.ndarray = np.full(unvisited.shape, -1, dtype=np.int32)
+        slots: np.ndarray = np.zeros(unvisited.shape, dtype=np.int64)
+        steps: np.ndarray = np.array((1, -1, stride, -stride))
+
+        frontier: np.ndarray = np.array([(target_y + 1) * stride + target_x + 1])
+        unvisited[frontier] = False
+        found[frontier] = 0
+        distance: int = 0
+
+        while len(frontier) > 0:
+            distance += 1
+            neighbours: np.ndarray = (frontier[:, np.newaxis] + steps).ravel()
+            neighbours = neighbours[unvisited[neighbours]]
+            order: np.ndarray = np.arange(len(neighbours))
+            slots[neighbours] = order
+            frontier = neighbours[slots[neighbours] == order]
+            unvisited[frontier] = False
+            found[frontier] = distance
+
+        distances[:] = found.reshape(height + 2, stride)[1:-1, 1:-1]
+        return distances
+
+
+    def get_shifted(cost: np.ndarray, dx: int, dy: int) -> np.ndarray:
+        height: int = cost.shape[0] - 2
+        width: int = cost.shape[1] - 2
+        return cost[1 + dy:1 + dy + height, 1 + dx:1 + dx + width]
+
+
+    def get_directions(distances: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        height, width = distances.shape
+        unreachable: int = np.iinfo(np.int32).max
+        cost: np.ndarray = np.full(
+            (height + 2, width + 2), unreachable, dtype=np.int32
+        )
+        cost[1:-1, 1:-1] = np.where(distances >= 0, distances, unreachable)
+
+        neighbours: list[np.ndarray] = []
+        for dx, dy in FlowField.offsets:
+            neighbour: np.ndarray = FlowField.get_shifted(cost, dx, dy)
+            if dx != 0 and dy != 0:
+                corner: np.ndarray = (
+                    (FlowField.get_shifted(cost, dx, 0) == unreachable) |
+                    (FlowField.get_shifted(cost, 0, dy) == unreachable)
+                )
+                neighbour = np.where(corner, unreachable, neighbour)
+            neighbours.append(neighbour)
+
+        stacked: np.ndarray = np.stack(neighbours)
+        best: np.ndarray = np.argmin(stacked, axis=0)
+        downhill: np.ndarray = (
+            np.take_along_axis(stacked, best[np.newaxis], axis=0)[0]
+            < cost[1:-1, 1:-1]
+        )
+
+        offsets: np.ndarray = np.array(FlowField.offsets, dtype=np.float32)
+        offsets /= np.hypot(offsets[:, 0], offsets[:, 1])[:, np.newaxis]
+        dir_x: np.ndarray = np.where(downhill, offsets[best, 0], 0)
+        dir_y: np.ndarray = np.where(downhill, offsets[best, 1], 0)
+        return dir_x.astype(np.float32), dir_y.astype(np.float32)
+
+
+    def __init__(self, tile_map: TileMap, radius: int=32) -> None:
+        self.tile_map = tile_map
+        self.tile_size = self.tile_map.tile_size
+        self.radius = radius
+
+        self.grid: np.ndarray | None = None
+        self.origin: tuple[int, int] = (0, 0)
+        self.target: tuple[int, int] | None = None
+        self.target_pos: tuple[float, float] = (0, 0)
+        self.dirty: bool = True
+        self.builds: int = 0
+
+        self.distances: np.ndarray = np.full((0, 0), -1, dtype=np.int32)
+        self.dir_x: np.ndarray = np.zeros((0, 0), dtype=np.float32)
+        self.dir_y: np.ndarray = np.zeros((0, 0), dtype=np.float32)
+        self.tile_map.add_listener(self.update_tile)
+
+
+    def close(self) -> None:
+        self.tile_map.remove_listener(self.update_tile)
+
+
+    def update_tile(self, x: int, y: int) -> None:
+        self.dirty = True
+
+
+    def set_target(self, x: float, y: float) -> bool:
+        self.target_pos = (x, y)
+        target: tuple[int, int] = (
+            math.floor(x / self.tile_size), math.floor(y / self.tile_size)
+        )
+        grid, origin_x, origin_y = self.tile_map.get_window(
+            x / self.tile_size, y / self.tile_size, self.radius
+        )
+
+        if (not self.dirty and target == self.target and grid is self.grid
+        and (origin_x, origin_y) == self.origin):
+            return False
+
+        self.grid = grid
+        self.origin = (origin_x, origin_y)
+        self.target = target
+        self.dirty = False
+        self.build()
+        return True
+
+
+    def build(self) -> None:
+        self.distances = FlowField.get_distances(
+            self.grid == 0, self.target[0] - self.origin[0],
+            self.target[1] - self.origin[1]
+        )
+        self.dir_x, self.dir_y = FlowField.get_directions(self.distances)
+        self.builds += 1
+
+
+    def get_cell(self, x: float, y: float) -> tuple[int, int] | None:
+        cx: int = math.floor(x / self.tile_size) - self.origin[0]
+        cy: int = math.floor(y / self.tile_size) - self.origin[1]
+        height, width = self.distances.shape
+
+        if cx < 0 or cx >= width or cy < 0 or cy >= height: return None
+        return (cx, cy)
+
+
+    def get_distance(self, x: float, y: float) -> int | None:
+        cell: tuple[int, int] | None = self.get_cell(x, y)
+        if cell is None: return None
+
+        distance: int = int(self.distances[cell[1], cell[0]])
+        return None if distance < 0 else distance
+
+
+    def get_direction(self, x: float, y: float) -> tuple[float, float]:
+        cell: tuple[int, int] | None = self.get_cell(x, y)
+        if cell is None: return (0, 0)
+
+        cx, cy = cell
+        if self.distances[cy, cx] != 0:
+            return (float(self.dir_x[cy, cx]), float(self.dir_y[cy, cx]))
+
+        dx: float = self.target_pos[0] - x
+        dy: float = self.target_pos[1] - y
+        length: float = math.hypot(dx, dy)
+        if length == 0: return (0, 0)
+        return (dx / length, dy / length)
+
+
+    def get_direction_batch(self, x: np.ndarray,
+    y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        cx: np.ndarray = np.floor(x / self.tile_size).astype(np.int64)
+        cy: np.ndarray = np.floor(y / self.tile_size).astype(np.int64)
+        cx -= self.origin[0]
+        cy -= self.origin[1]
+        height, width = self.distances.shape
+        inside: np.ndarray = (cx >= 0) & (cx < width) & (cy >= 0) & (cy < height)
+
+        dir_x: np.ndarray = np.zeros(len(x))
+        dir_y: np.ndarray = np.zeros(len(x))
+        dir_x[inside] = self.dir_x[cy[inside], cx[inside]]
+        dir_y[inside] = self.dir_y[cy[inside], cx[inside]]
+
+        arrived: np.ndarray = np.zeros(len(x), dtype=bool)
+        arrived[inside] = self.distances[cy[inside], cx[inside]] == 0
+        dx: np.ndarray = self.target_pos[0] - x[arrived]
+        dy: np.ndarray = self.target_pos[1] - y[arrived]
+        length: np.ndarray = np.hypot(dx, dy)
+        length[length == 0] = np.inf
+        dir_x[arrived] = dx / length
+        dir_y[arrived] = dy / length
+
+        return dir_x, dir_y
@@ -0,0 +1,35 @@
+class GameClock:
+
+    def __init__(self, tick_rate: int=60, max_steps: int=5) -> None:
+        self.tick_rate = tick_rate
+        self.max_steps = max_steps
+        self.dt: float = 1 / self.tick_rate
+
+        self.tick: int = 0
+        self.time: float = 0
+        self.accumulator: float = 0
+
+
+    def advance(self, frame_seconds: float) -> int:
+        self.accumulator += max(frame_seconds, 0)
+        steps: int = int(self.accumulator / self.dt)
+
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = self.max_steps * self.dt
+
+        self.accumulator -= steps * self.dt
+        return steps
+
+
+    def step(self) -> None:
+        self.tick += 1
+        self.time = self.tick * self.dt
+
+
+    def get_alpha(self) -> float:
+        return min(self.accumulator / self.dt, 1)
+
+
+    def get_render_time(self) -> float:
+        return self.time + self.accumulator
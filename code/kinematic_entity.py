@@ -1,8 +1,32 @@
 import pygame as pg
+import numpy as np
 from tile_map import TileMap
+from spatial_hash import SpatialHash
 
 class KinematicEntity:
 
+    def move_batch(tile_map: TileMap, x: np.ndarray, y: np.ndarray,
+    vel_x: np.ndarray,
+    vel_y: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        tile_size: int = tile_map.tile_size
+        tile_x: np.ndarray = (x / tile_size).astype(np.int64)
+        tile_y: np.ndarray = (y / tile_size).astype(np.int64)
+        next_tile_x: np.ndarray = ((x + vel_x) / tile_size).astype(np.int64)
+        next_tile_y: np.ndarray = ((y + vel_y) / tile_size).astype(np.int64)
+
+        move_x: np.ndarray = tile_map.get_free_mask(next_tile_x, tile_y)
+        move_y: np.ndarray = tile_map.get_free_mask(tile_x, next_tile_y)
+        both: np.ndarray = move_x & move_y
+        here: np.ndarray = tile_map.get_free_mask(tile_x, tile_y)
+        prefer_x: np.ndarray = here | (vel_x > vel_y)
+        prefer_y: np.ndarray = here | ~(vel_x > vel_y)
+
+        dx: np.ndarray = np.where(both, prefer_x, move_x) * vel_x
+        dy: np.ndarray = np.where(both, prefer_y, ~move_x & move_y) * vel_y
+
+        return x + dx, y + dy, ~both
+
+
     def __init__(self, x: float, y: float, width: float,
     height: float, tile_map: TileMap) -> None:
         self.x = x
@@ -16,8 +40,46 @@ class KinematicEntity:
         self.vel_x: float = 0
         self.vel_y: float = 0
 
+        self.spatial_hash: SpatialHash | None = None
+        self.save_state()
+
+
+    def save_state(self) -> None:
+        self.prev_x: float = self.x
+        self.prev_y: float = self.y
+
+
+    def begin_render(self, alpha: float) -> None:
+        self.sim_x: float = self.x
+        self.sim_y: float = self.y
+        self.x = self.prev_x + (self.x - self.prev_x) * alpha
+        self.y = self.prev_y + (self.y - self.prev_y) * alpha
+
+
+    def end_render(self) -> None:
+        self.x = self.sim_x
+        self.y = self.sim_y
+
+
+    def set_spatial_hash(self, spatial_hash: SpatialHash | None) -> None:
+        if not self.spatial_hash is None:
+            self.spatial_hash.remove(self)
+
+        self.spatial_hash = spatial_hash
+        if not self.spatial_hash is None:
+            self.spatial_hash.insert(self)
+
 
     def move(self, collide: bool=True) -> bool:
+        collision: bool = self.move_in_map(collide)
+
+        if not self.spatial_hash is None:
+            self.spatial_hash.update(self)
+
+        return collision
+
+
+    def move_in_map(self, collide: bool) -> bool:
         if not collide:
             self.x += self.vel_x
             self.y += self.vel_y
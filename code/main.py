@@ -2,11 +2,17 @@ import pygame as pg
 import sys
 import preload
 import json
-from time import time
+from time import perf_counter
 from player import Player
 from tile_map import TileMap
+from chunked_tile_map import ChunkedTileMap
 from tile import Tile
 from entity import Entity
+from entity_store import EntityStore
+from flow_field import FlowField
+from resolution_controller import ResolutionController
+from ui import UILayer, Widget
+from game_clock import GameClock
 
 class Game:
 
@@ -20,32 +26,45 @@ class Game:
         self.init_display()
         self.init_effects()
 
-        self.tile_map: TileMap = TileMap((16, 16), 32)
+        self.tile_map: TileMap = self.load_tile_map(self.paths["tile_map"])
 
-        for i in range(16 * 16):
-            if i % 14 == 0:
-                self.tile_map.grid[i] = Tile("block")
-            elif (i % 7 == 0
-            or i // 16 == 0
-            or i // 16 == 15
-            or i % 16 == 0
-            or i % 16 == 15):
-                self.tile_map.grid[i] = Tile("brick")
-
-        self.player: Player = Player(150, 150, self.tile_map)
+        self.game_clock: GameClock = GameClock()
+        self.player: Player = Player(
+            150, 150, self.tile_map, self.game_clock
+        )
         self.entities: list[Entity] = [
             Entity("ghost", 300, 300, self.tile_map),
             Entity("box", 100, 50, self.tile_map),
             Entity("bullet", 200, 100, self.tile_map)
         ]
+        self.entity_store: EntityStore = EntityStore(self.tile_map)
+        for entity in self.entities:
+            self.entity_store.add(entity)
+        self.flow_field: FlowField = FlowField(self.tile_map)
         self.clock: pg.time.Clock = pg.time.Clock()
         self.ticks: int = 0
         self.fps_start_ticks: int = 0
         self.monitor_fps: bool = False
-        self.fps_start: float = time()
+        self.fps_start: float = perf_counter()
         self.mouse_pos: tuple[int, int] = (0, 0)
 
-        self.game_loop()
+        self.dynamic_resolution: bool = True
+        self.resolution: ResolutionController = ResolutionController(
+            self.screens["main_view"].get_size()
+        )
+        self.render_views: dict[
+            tuple[int, int], tuple[pg.Surface, pg.Surface]
+        ] = {}
+        self.main_view_state: tuple | None = None
+        self.apply_resolution()
+
+        self.init_ui()
+
+
+    def load_tile_map(self, path: str) -> TileMap:
+        if path.endswith(".json"): return TileMap.load_json(path, 32)
+        if path.endswith(".tchk"): return ChunkedTileMap(path)
+        return TileMap.load_binary(path)
 
 
     def init_dependencies(self) -> None:
@@ -95,58 +114,137 @@ class Game:
         
 
     def init_effects(self) -> None:
+        main_view_size: tuple[int, int] = self.screens["main_view"].get_size()
+
         self.gradient: pg.Surface = preload.get_gradient(
-            (0, 0, 0), (255, 255, 255)
+            (0, 0, 0), (255, 255, 255), main_view_size
         )
-        self.gradient = pg.transform.scale(self.gradient, self.screen_size)
 
         self.minimap_size: tuple[int, int] = (256, 256)
-        self.minimap_effect: pg.Surface = preload.get_minimap_effect()
-        self.minimap_effect = pg.transform.scale(
-            self.minimap_effect, (128, 128)
+        self.minimap_effect: pg.Surface = preload.get_minimap_effect(
+            (128, 128)
         )
         self.vignette: pg.Surface = preload.get_vignette(
-            (255, 255, 255), (0, 0, 0), "vignette"
-        )
-        self.vignette = pg.transform.scale(
-            self.vignette, self.screens["main_view"].get_size()
+            (255, 255, 255), (0, 0, 0), "vignette", main_view_size
         )
         self.low_health_vignette: pg.Surface = preload.get_vignette(
-            (255, 255, 255), (255, 0, 0), "low_health_vignette"
+            (255, 255, 255), (255, 0, 0), "low_health_vignette",
+            main_view_size
         )
-        self.low_health_vignette = pg.transform.scale(
-            self.low_health_vignette, self.screens["main_view"].get_size()
+
+
+    def init_ui(self) -> None:
+        p: Player = self.player
+        self.player_name: str = "some guy"
+        self.text_cache: dict[str, pg.Surface] = {}
+        self.dirty_rects: list[pg.Rect] = []
+
+        self.ammo_pos: tuple[int, int] = (153, 90)
+        self.cooldown_pos: tuple[int, int] = (
+            153, self.ammo_pos[1] + self.ammo_img.get_height() + 4
         )
+        self.cooldown_width: int = (self.ammo_img.get_width() + 2) * 10
+        self.magazine_pos: tuple[int, int] = (153, 138)
+        self.health_pos: tuple[int, int] = (499, 35)
+        self.minimap_pos: tuple[int, int] = (334, 34)
+
+        self.ui_layer: UILayer = UILayer(
+            self.screens["ui"], self.ui_img, (0, 512)
+        )
+        self.ui_layer.add_widget(
+            (155, 36, 152, self.get_name_text(self.player_name).get_height()),
+            lambda: self.player_name, lambda: self.draw_name()
+        )
+        self.ui_layer.add_widget((
+            *self.ammo_pos,
+            (self.ammo_img.get_width() + 2) * p.ammo_per_magazine,
+            self.ammo_img.get_height()
+        ), lambda: p.ammo, lambda: self.draw_ammo())
+        self.cooldown_widget: Widget = self.ui_layer.add_widget(
+            (*self.cooldown_pos, self.cooldown_width + 1, 1),
+            lambda: self.get_cooldown(), lambda: self.draw_cooldown()
+        )
+        self.ui_layer.add_widget((
+            *self.magazine_pos,
+            (self.magazine_img.get_width() + 2) * p.max_magazine,
+            self.magazine_img.get_height()
+        ), lambda: p.magazine, lambda: self.draw_magazines())
+        self.ui_layer.add_widget((
+            *self.health_pos,
+            (self.full_heart_img.get_width() + 2) * p.max_health,
+            self.full_heart_img.get_height()
+        ), lambda: p.health, lambda: self.draw_health())
+        self.ui_layer.add_widget((
+            *self.minimap_pos,
+            int(self.minimap_size[0] / 2), int(self.minimap_size[1] / 2)
+        ), lambda: self.get_minimap_state(), lambda: self.draw_minimap())
+
+
+    def apply_resolution(self) -> None:
+        self.player.set_resolution(self.resolution.get_ray_count())
+
+
+    def update_resolution(self, frame_ms: float) -> None:
+        if not self.player.walls_redrawn: return
+        if self.resolution.add_frame_time(frame_ms, self.dynamic_resolution):
+            self.apply_resolution()
+
+
+    def get_render_view(self) -> tuple[pg.Surface, pg.Surface]:
+        size: tuple[int, int] = self.resolution.get_render_size()
+        if not size in self.render_views:
+            gradient: pg.Surface = self.gradient
+            if size != self.gradient.get_size():
+                gradient = preload.get_gradient(
+                    (0, 0, 0), (255, 255, 255), size
+                )
+            self.render_views[size] = (pg.surface.Surface(size), gradient)
+
+        return self.render_views[size]
 
 
     def game_loop(self) -> None:
+        last_frame: float = perf_counter()
+
         while True:
-            if time() - self.fps_start > 1 and self.ticks > 0:
+            frame_start: float = perf_counter()
+            frame_seconds: float = frame_start - last_frame
+            last_frame = frame_start
+
+            if frame_start - self.fps_start > 1 and self.ticks > 0:
                 if self.monitor_fps:
                     fps: float = round(
-                        1 / ((time() - self.fps_start)
+                        1 / ((frame_start - self.fps_start)
                         / (self.ticks - self.fps_start_ticks))
                     )
                     print(f"fps: {fps}")
-                self.fps_start = time()
+                self.fps_start = frame_start
                 self.fps_start_ticks = self.ticks
             self.ticks += 1
 
             for event in pg.event.get():
                 self.handle_event(event)
 
-            self.update()
+            for _ in range(self.game_clock.advance(frame_seconds)):
+                self.update()
             self.draw()
 
-            pg.display.flip()
+            self.present()
+            self.update_resolution((perf_counter() - frame_start) * 1000)
             self.clock.tick(60 if not self.monitor_fps else 0)
             
 
     def handle_event(self, event) -> None:
         if event.type == pg.QUIT:
+            self.player.close()
+            self.flow_field.close()
             pg.quit()
             sys.exit()
 
+        if event.type in (pg.VIDEOEXPOSE, pg.WINDOWEXPOSED):
+            self.ui_layer.invalidate()
+            self.main_view_state = None
+
         self.player.handle_event(event)
 
         if event.type == pg.MOUSEMOTION:
@@ -171,63 +269,99 @@ class Game:
 
 
     def update(self) -> None:
+        for obj in self.get_moving_objects():
+            obj.save_state()
+
         self.player.update(self.entities)
+        if len(self.entity_store.get_chasers()) > 0:
+            self.flow_field.set_target(self.player.x, self.player.y)
+            self.entity_store.steer(self.flow_field)
+        self.entity_store.update()
+
+        self.game_clock.step()
+
+
+    def set_chase_speed(self, name: str, speed: float) -> None:
         for entity in self.entities:
-            entity.update(self.player)
+            if entity.name == name: entity.set_chase_speed(speed)
+
+
+    def get_moving_objects(self) -> list:
+        return [
+            self.player, self.entity_store, self.player.bullet_pool.store
+        ]
 
 
     def draw(self) -> None:
-        self.screens["screen"].fill(0)
+        self.dirty_rects = []
+        alpha: float = self.game_clock.get_alpha()
+        moving: list = self.get_moving_objects()
 
+        for obj in moving:
+            obj.begin_render(alpha)
+
+        self.player.prepare_render(self.entities)
         self.draw_main_view()
         self.draw_ui()
 
+        for obj in moving:
+            obj.end_render()
 
-    def draw_main_view(self) -> None:
-        self.screens["main_view"].blit(pg.transform.scale(
-                self.gradient, self.screens["main_view"].get_size()
-        ), (0, 0))
 
-        self.player.draw_3d(self.screens["main_view"], self.entities)
+    def present(self) -> None:
+        pg.display.update(self.dirty_rects)
 
-        has_taken_damage: bool = (
-            self.player.last_damage_time + 0.5 >= time()
-        )
+
+    def draw_main_view(self) -> None:
+        view, gradient = self.get_render_view()
+        changed: bool = self.player.draw_3d(view, self.entities, gradient)
+
+        now: float = self.game_clock.get_render_time()
+        has_taken_damage: bool = self.player.last_damage_time + 0.5 >= now
         low_health: bool = self.player.health == 1
-        period: float = (self.player.last_damage_time + time()) % 1
+        period: float = (self.player.last_damage_time + now) % 1
         blink: bool = period < 0.5
 
+        vignette: pg.Surface = self.vignette
         if has_taken_damage or (low_health and blink):
-            self.screens["main_view"].blit(
-                self.low_health_vignette, (0, 0), special_flags=pg.BLEND_RGB_MULT
-            )
-        else:
-            self.screens["main_view"].blit(
-                self.vignette, (0, 0), special_flags=pg.BLEND_RGB_MULT
+            vignette = self.low_health_vignette
+
+        state: tuple = (id(view), id(vignette))
+        if not changed and state == self.main_view_state: return
+        self.main_view_state = state
+
+        source: pg.Surface = view
+        if view.get_size() != self.screens["main_view"].get_size():
+            source = pg.transform.scale(
+                view, self.screens["main_view"].get_size(),
+                self.screens["main_view"]
             )
 
-        self.screens["screen"].blit(self.screens["main_view"], (0, 0))
+        self.dirty_rects.append(
+            self.screens["screen"].blit(source, (0, 0))
+        )
+        self.screens["screen"].blit(
+            vignette, (0, 0), special_flags=pg.BLEND_RGB_MULT
+        )
 
 
     def draw_ui(self) -> None:
-        self.screens["ui"].blit(self.ui_img, (0, 0))
+        dirty_rects: list[pg.Rect] = self.ui_layer.update()
+        self.dirty_rects.extend(
+            self.ui_layer.blit_dirty(self.screens["screen"], dirty_rects)
+        )
 
-        self.draw_minimap()
-        self.draw_name()
-        self.draw_ammo()
-        self.draw_health()
 
-        self.screens["screen"].blit(self.screens["ui"], (0, 512))
+    def get_minimap_state(self) -> tuple:
+        return (
+            int((self.game_clock.tick / 2) % int(self.minimap_size[1] / 2)),
+            int(self.player.x), int(self.player.y), self.player.angle,
+            tuple((int(e.x), int(e.y)) for e in self.entities),
+            self.tile_map.revision
+        )
 
 
     def draw_minimap(self) -> None:
-        self.screens["minimap"].fill(0x002200)
-        self.tile_map.draw(self.screens["minimap"])
-        for entity in self.entities:
-            entity.draw_2d(self.screens["minimap"])
-        self.player.draw_2d(self.screens["minimap"])
-        
-        pos: tuple[int, int] = (334, 34)
         w: int = self.minimap_size[0]
         h: int = self.minimap_size[1]
         w2: int = int(w / 2)
@@ -238,11 +372,16 @@ class Game:
             w / 2, h / 2
         )
 
+        self.tile_map.draw(self.screens["minimap"], area)
+        for entity in self.entities:
+            entity.draw_2d(self.screens["minimap"])
+        self.player.draw_2d(self.screens["minimap"])
+
         pos2: tuple[int, int] = (
-            area[0], area[1] + int((self.ticks / 2) % h2)
+            area[0], area[1] + int((self.game_clock.tick / 2) % h2)
         )
         pos3: tuple[int, int] = (
-            area[0], area[1] + int((self.ticks / 2) % h2) - h2
+            area[0], area[1] + int((self.game_clock.tick / 2) % h2) - h2
         )
 
         self.screens["minimap"].blit(
@@ -251,50 +390,67 @@ class Game:
         self.screens["minimap"].blit(
             self.minimap_effect, pos3, special_flags=pg.BLEND_RGB_ADD
         )
-        self.screens["ui"].blit(self.screens["minimap"], pos, area)
+        self.screens["ui"].blit(self.screens["minimap"], self.minimap_pos, area)
 
 
-    def draw_name(self) -> None:
-        text: pg.Surface = self.font.render("some guy", True, 0)
+    def get_name_text(self, name: str) -> pg.Surface:
+        if name in self.text_cache: return self.text_cache[name]
+
+        text: pg.Surface = self.font.render(name, True, 0)
         text = pg.transform.scale2x(text)
         if text.get_width() > 152:
             text = pg.transform.scale(text, (152, text.get_height()))
+
+        self.text_cache[name] = text
+        return text
+
+
+    def draw_name(self) -> None:
+        text: pg.Surface = self.get_name_text(self.player_name)
         self.screens["ui"].blit(
             text, (int(231 - text.get_width() / 2), 36)
         )
 
 
     def draw_ammo(self) -> None:
-        p: Player = self.player
-        x: int = 153
-        y1: int = 90
-        y_cd: int = y1 + self.ammo_img.get_height() + 4
-        y2: int = 138
-        w = (self.ammo_img.get_width() + 2) * 10
+        x, y = self.ammo_pos
 
-        for i in range(p.ammo):
+        for i in range(self.player.ammo):
             offset: int = (self.ammo_img.get_width() + 2) * i
-            self.screens["ui"].blit(self.ammo_img, (x + offset, y1))
+            self.screens["ui"].blit(self.ammo_img, (x + offset, y))
+
+
+    def get_cooldown(self) -> int:
+        p: Player = self.player
+        w: int = self.cooldown_width
+        now: float = self.game_clock.get_render_time()
 
         if p.ammo > 0:
-            t: int = int((time() - p.last_shot_time) / p.shooting_period * w)
+            t: int = int((now - p.last_shot_time) / p.shooting_period * w)
         else:
-            t: int = int((time() - p.last_shot_time) / p.reload_time * w)
+            t: int = int((now - p.last_shot_time) / p.reload_time * w)
+
+        return max(w - t, 0)
+
+
+    def draw_cooldown(self) -> None:
+        length: int = self.cooldown_widget.state
+        if length <= 0: return
+
+        x, y = self.cooldown_pos
+        pg.draw.line(self.screens["ui"], 0x00DD00, (x, y), (x + length, y))
+
 
-        t = min(t, w)
-        if t < w:
-            start: tuple[int, int] = (x, y_cd)
-            end: tuple[int, int] = (x + w - t, y_cd)
-            pg.draw.line(self.screens["ui"], 0x00DD00, start, end)
+    def draw_magazines(self) -> None:
+        x, y = self.magazine_pos
 
         for i in range(self.player.magazine):
             offset: int = (self.magazine_img.get_width() + 2) * i
-            self.screens["ui"].blit(self.magazine_img, (x + offset, y2))
+            self.screens["ui"].blit(self.magazine_img, (x + offset, y))
 
 
     def draw_health(self) -> None:
-        x: int = 499
-        y: int = 35
+        x, y = self.health_pos
         w: int = self.full_heart_img.get_width()
 
         for i in range(self.player.health):
@@ -302,4 +458,4 @@ class Game:
 
 
 if __name__ == "__main__":
-    Game()
\ No newline at end of file
+    Game().game_loop()
\ No newline at end of file
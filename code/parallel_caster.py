@@ -0,0 +1,247 @@
+import os
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from ray_caster import RayCaster, RayHits
+from tile_map import TileMap
+from map_object import MapObject
+
+class SharedArray:
+
+    def __init__(self, shape: tuple[int, ...], dtype: np.dtype,
+    name: str | None=None) -> None:
+        dtype = np.dtype(dtype)
+        size: int = max(int(np.prod(shape)) * dtype.itemsize, 1)
+
+        self.owner: bool = name is None
+        if self.owner:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+
+        self.array: np.ndarray = np.ndarray(
+            shape, dtype=dtype, buffer=self.memory.buf
+        )
+        self.spec: tuple[str, tuple[int, ...], str] = (
+            self.memory.name, tuple(shape), dtype.str
+        )
+
+
+    def attach(spec: tuple[str, tuple[int, ...], str]) -> "SharedArray":
+        name, shape, dtype = spec
+        return SharedArray(shape, np.dtype(dtype), name)
+
+
+    def close(self) -> None:
+        self.array = None
+        try: self.memory.close()
+        except BufferError: pass
+        if self.owner: self.memory.unlink()
+
+
+class ParallelRayCaster(RayCaster):
+
+    def run_worker(connection: Connection,
+    angle_spec: tuple, output_specs: dict[str, tuple]) -> None:
+        angles: SharedArray = SharedArray.attach(angle_spec)
+        outputs: dict[str, SharedArray] = {
+            name: SharedArray.attach(spec)
+            for name, spec in output_specs.items()
+        }
+        shared: dict[str, SharedArray] = {}
+
+        while True:
+            task: tuple | None = connection.recv()
+            if task is None: break
+
+            x, y, start, end, grid_spec, field_spec, use_field, origin, \
+            tile_size, depth = task
+
+            if not grid_spec[0] in shared or not field_spec[0] in shared:
+                for array in shared.values(): array.close()
+                shared = {
+                    spec[0]: SharedArray.attach(spec)
+                    for spec in (grid_spec, field_spec)
+                }
+
+            hits: RayHits = RayHits(
+                x, y, angles.array[start:end], {
+                    name: output.array[start:end]
+                    for name, output in outputs.items()
+                }
+            )
+            RayCaster.cast_grid(
+                hits, shared[grid_spec[0]].array, shared[field_spec[0]].array,
+                use_field, origin, tile_size, depth
+            )
+            del hits
+            connection.send(end - start)
+
+        for array in [angles, *outputs.values(), *shared.values()]:
+            array.close()
+
+
+    def __init__(self, tile_map: TileMap, workers: int,
+    capacity: int=4096) -> None:
+        RayCaster.__init__(self, tile_map)
+        self.capacity = capacity
+        self.processes: list[mp.Process] = []
+        self.connections: list[Connection] = []
+        self.outputs: dict[str, SharedArray] = {}
+        self.angles: SharedArray | None = None
+        self.shared_grid: SharedArray | None = None
+        self.shared_field: SharedArray | None = None
+        self.source_grid: np.ndarray | None = None
+
+        if workers > 1:
+            try: self.start(workers)
+            except (OSError, ValueError, ImportError): self.stop()
+
+
+    def start(self, workers: int) -> None:
+        os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        context: mp.context.BaseContext = mp.get_context("spawn")
+
+        self.angles = SharedArray((self.capacity,), np.float64)
+        for name, dtype in RayHits.fields:
+            self.outputs[name] = SharedArray((self.capacity,), dtype)
+        output_specs: dict[str, tuple] = {
+            name: output.spec for name, output in self.outputs.items()
+        }
+
+        for _ in range(workers):
+            parent, child = context.Pipe()
+            process: mp.Process = context.Process(
+                target=ParallelRayCaster.run_worker,
+                args=(child, self.angles.spec, output_specs), daemon=True
+            )
+            process.start()
+            child.close()
+
+            self.processes.append(process)
+            self.connections.append(parent)
+
+
+    def get_worker_count(self) -> int:
+        return max(len(self.processes), 1)
+
+
+    def stop(self) -> None:
+        for connection in self.connections:
+            try: connection.send(None)
+            except (OSError, ValueError): pass
+            connection.close()
+
+        for process in self.processes:
+            process.join(1)
+            if process.is_alive(): process.terminate()
+
+        shared: list[SharedArray | None] = [
+            self.angles, self.shared_grid, self.shared_field,
+            *self.outputs.values()
+        ]
+        for array in shared:
+            if not array is None: array.close()
+
+        self.processes.clear()
+        self.connections.clear()
+        self.outputs.clear()
+        self.angles = None
+        self.shared_grid = None
+        self.shared_field = None
+        self.source_grid = None
+
+
+    def close(self) -> None:
+        self.stop()
+        RayCaster.close(self)
+
+
+    def share(self, shared: SharedArray | None,
+    array: np.ndarray) -> SharedArray:
+        if (shared is None or shared.array.shape != array.shape
+        or shared.array.dtype != array.dtype):
+            if not shared is None: shared.close()
+            shared = SharedArray(array.shape, array.dtype)
+
+        shared.array[:] = array
+        return shared
+
+
+    def sync_grid(self, grid: np.ndarray, origin_x: int,
+    origin_y: int) -> None:
+        self.origin = (origin_x, origin_y)
+        if grid is self.source_grid: return
+
+        if not self.distance_field.grid is grid:
+            self.distance_field.build(grid)
+
+        self.shared_grid = self.share(self.shared_grid, grid)
+        self.shared_field = self.share(
+            self.shared_field, self.distance_field.field
+        )
+        self.source_grid = grid
+
+
+    def update_tile(self, x: int, y: int) -> None:
+        RayCaster.update_tile(self, x, y)
+        if self.shared_grid is None or self.source_grid is None: return
+
+        local_x: int = x - self.origin[0]
+        local_y: int = y - self.origin[1]
+        height, width = self.source_grid.shape
+        if local_x < 0 or local_x >= width or local_y < 0 or local_y >= height:
+            return
+
+        reach: int = self.distance_field.max_distance
+        area: tuple[slice, slice] = (
+            slice(max(local_y - reach, 0), local_y + reach + 1),
+            slice(max(local_x - reach, 0), local_x + reach + 1)
+        )
+        self.shared_grid.array[local_y, local_x] = (
+            self.source_grid[local_y, local_x]
+        )
+        self.shared_field.array[area] = self.distance_field.field[area]
+
+
+    def cast(self, x: float, y: float, angles: np.ndarray) -> RayHits:
+        count: int = len(angles)
+        if len(self.processes) == 0 or count > self.capacity:
+            return RayCaster.cast(self, x, y, angles)
+
+        depth: int = MapObject.depth
+        px: float = x / self.tile_size
+        py: float = y / self.tile_size
+        grid, origin_x, origin_y = self.tile_map.get_window(px, py, depth + 1)
+        self.sync_grid(grid, origin_x, origin_y)
+
+        self.angles.array[:count] = angles
+        hits: RayHits = RayHits(
+            x, y, self.angles.array[:count], {
+                name: output.array for name, output in self.outputs.items()
+            }
+        )
+
+        bounds: np.ndarray = np.linspace(
+            0, count, len(self.connections) + 1
+        ).astype(int)
+        task: tuple = (
+            self.shared_grid.spec, self.shared_field.spec,
+            self.distance_field.max_value > 1, (origin_x, origin_y),
+            self.tile_size, depth
+        )
+
+        try:
+            for i in range(len(self.connections)):
+                self.connections[i].send(
+                    (x, y, int(bounds[i]), int(bounds[i + 1]), *task)
+                )
+            for connection in self.connections:
+                connection.recv()
+        except (EOFError, OSError):
+            del hits
+            self.stop()
+            return RayCaster.cast(self, x, y, angles)
+
+        return hits
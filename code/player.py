@@ -1,17 +1,21 @@
 import pygame as pg
 import math
-from time import time
 from tile_map import TileMap
 from bullet import Bullet
+from bullet_pool import BulletPool
 from entity import Entity
 from camera import Camera
 from kinematic_entity import KinematicEntity
+from spatial_hash import SpatialHash
+from game_clock import GameClock
 
 class Player(Camera, KinematicEntity):
 
-    def __init__(self, x: float, y: float, tile_map: TileMap):
+    def __init__(self, x: float, y: float, tile_map: TileMap,
+    clock: GameClock | None=None):
         Camera.__init__(self, x, y, tile_map)
         KinematicEntity.__init__(self, x, y, 8, 8, tile_map)
+        self.clock: GameClock = GameClock() if clock is None else clock
 
         self.init_movement()
         self.init_combat()
@@ -45,15 +49,17 @@ class Player(Camera, KinematicEntity):
         self.ammo_per_magazine: int = 6
 
         self.damage_immunity: float = 2
-        self.last_damage_time: float = 0
+        self.last_damage_time: float = self.clock.time - self.damage_immunity
         self.health: int = self.max_health
         self.ammo: int = self.ammo_per_magazine
         self.magazine: int = self.max_magazine
 
         self.reload_time: float = 3
         self.shooting_period: float = 1
-        self.last_shot_time: float = time() - self.shooting_period
-        self.bullets: list[Bullet] = []
+        self.last_shot_time: float = self.clock.time - self.shooting_period
+        self.bullet_pool: BulletPool = BulletPool(self.tile_map)
+        self.bullets: list[Bullet] = self.bullet_pool.active
+        self.entity_hash: SpatialHash = SpatialHash(self.tile_map.tile_size)
 
 
     def handle_event(self, event: pg.event.Event) -> None:
@@ -102,7 +108,31 @@ class Player(Camera, KinematicEntity):
             self.angle = self.angle + math.tau
 
         self.update_combat(entities)
-        self.update_rays()
+
+
+    def save_state(self) -> None:
+        KinematicEntity.save_state(self)
+        self.prev_angle: float = self.angle
+
+
+    def begin_render(self, alpha: float) -> None:
+        KinematicEntity.begin_render(self, alpha)
+        self.sim_angle: float = self.angle
+
+        diff: float = (self.angle - self.prev_angle + math.pi) % math.tau
+        self.angle = (self.prev_angle + (diff - math.pi) * alpha) % math.tau
+
+
+    def end_render(self) -> None:
+        KinematicEntity.end_render(self)
+        self.angle = self.sim_angle
+
+
+    def prepare_render(self, entities: list[Entity]) -> None:
+        self.refresh_rays()
+
+        self.project_entities(entities)
+        self.project_entities(self.bullets)
 
 
     def handle_movement(self) -> None:
@@ -137,7 +167,7 @@ class Player(Camera, KinematicEntity):
 
 
     def update_combat(self, entities: list[Entity]) -> None:
-        ready: bool = self.last_shot_time + self.reload_time < time()
+        ready: bool = self.last_shot_time + self.reload_time < self.clock.time
         no_ammo: bool = self.ammo < 1
         has_magazine: bool = self.magazine > 0
 
@@ -148,38 +178,28 @@ class Player(Camera, KinematicEntity):
         if self.actions["shoot"]:
             self.shoot()
 
-        idx_to_remove: list[Bullet] = []
+        for entity in entities:
+            if entity.spatial_hash is None:
+                entity.set_spatial_hash(self.entity_hash)
 
-        for i in range(len(self.bullets)):
-            bullet: Bullet = self.bullets[i]
+        self.bullet_pool.update(self.entity_hash)
 
-            if bullet.update(self):
-                idx_to_remove.append(i)
-                continue
-            
-            for entity in entities:
-                if bullet.collide(entity):
-                    idx_to_remove.append(i)
-
-        for entity in entities:
-            if self.last_damage_time + self.damage_immunity < time():
+        if self.last_damage_time + self.damage_immunity < self.clock.time:
+            for entity in self.entity_hash.query_object(self):
                 if self.collide(entity):
-                    self.last_damage_time = time()
+                    self.last_damage_time = self.clock.time
                     self.health -= 1
-
-        while len(idx_to_remove) > 0:
-            idx: int = idx_to_remove.pop()
-            del self.bullets[idx]
+                    break
 
 
     def shoot(self) -> None:
-        if self.last_shot_time + self.shooting_period > time(): return
+        if self.last_shot_time + self.shooting_period > self.clock.time: return
         if self.ammo < 1: return
         
         self.ammo -= 1
-        self.last_shot_time = time()
+        self.last_shot_time = self.clock.time
 
-        self.bullets.append(Bullet(self.x, self.y,self.tile_map, self.angle))
+        self.bullet_pool.spawn(self.x, self.y, self.angle)
 
 
     def draw_2d(self, surf: pg.Surface) -> None:
@@ -205,7 +225,8 @@ class Player(Camera, KinematicEntity):
         pg.draw.polygon(surf, (255, 128, 0), points)
 
 
-    def draw_3d(self, surf: pg.Surface, entities: list[Entity]) -> None:
+    def draw_3d(self, surf: pg.Surface, entities: list[Entity],
+    background: pg.Surface | None=None) -> bool:
         union = entities.copy()
         union.extend(self.bullets)
-        Camera.draw_3d(self, surf, union)
\ No newline at end of file
+        return Camera.draw_3d(self, surf, union, background)
\ No newline at end of file
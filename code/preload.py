@@ -1,47 +1,30 @@
 import pygame as pg
 import json
-from PIL import Image, ImageDraw
+import os
+import hashlib
+import numpy as np
 
-def slice_texture(name: str) -> None:
-    slice_path: str = ""
+def get_texture(name: str) -> pg.Surface:
     texture_path: str = ""
     with open("../paths.json") as file:
         paths: dict[str, str] = json.load(file)
-        slice_path = paths["slices"]
         texture_path = paths["textures"]
-    
-    img: Image.Image = Image.open(texture_path + "/" + name + ".jpg")
-
-    for x in range(img.size[0]):
-        cropped: Image.Image = img.crop((
-            x, 0, x + 1, img.size[1]
-        ))
 
-        cropped.save(slice_path + "/" + name + str(x) + ".jpg")
-
-def get_texture_slices(name: str) -> list[pg.Surface]:
-    slice_texture(name)
-    slice_path: str = ""
-    with open("../paths.json") as file:
-        paths: dict[str, str] = json.load(file)
-        slice_path = paths["slices"]
-    
-    i: int = 1
-    slices: list[pg.Surface] = []
-    
-    while True:
-        try:
-            path: str = slice_path + "/" + name + str(i) + ".jpg"
-            current: pg.Surface = pg.image.load(path)
-        except FileNotFoundError:
-            break
-        slices.append(current)
+    return pg.image.load(texture_path + "/" + name + ".jpg")
 
-        i += 1
+def get_texture_slices(texture: pg.Surface) -> list[pg.Surface]:
+    height: int = texture.get_height()
 
-    return slices
+    return [
+        texture.subsurface((x, 0, 1, height))
+        for x in range(texture.get_width())
+    ]
 
 def get_sprites(name: str) -> pg.Surface:
+    return get_sprite_mips(name)[0]
+
+def get_sprite_mips(name: str,
+scales: tuple[int, ...]=(8, 4, 2, 1)) -> list[pg.Surface]:
     sprites_path: str = ""
     with open("../paths.json") as file:
         paths: dict[str, str] = json.load(file)
@@ -49,83 +32,93 @@ def get_sprites(name: str) -> pg.Surface:
     
     img: pg.Surface = pg.image.load(sprites_path + "/" + name + ".png")
 
-    return pg.transform.scale_by((img), 8)
+    return [pg.transform.scale_by(img, scale) for scale in scales]
 
-def get_gradient(start: tuple[int, int, int],
-end: tuple[int, int, int]) -> pg.Surface:
-    assets_path: str = ""
-    with open("../paths.json") as file:
-        paths: dict[str, str] = json.load(file)
-        assets_path = paths["assets"]
-
-    size = 1024
-    img: Image.Image = Image.new("RGB", (size, size))
-    draw: ImageDraw.ImageDraw = ImageDraw.Draw(img)
-    for i in range(size):
-        t: float = abs(i - size / 2) / size * 2
-        draw.rectangle((0, i, size, i + 1), (
-            int((end[0] - start[0]) * t + start[0]),
-            int((end[1] - start[1]) * t + start[1]),
-            int((end[2] - start[2]) * t + start[2])
-        ))
-
-    path: str = assets_path + "/gradient.jpg"
-    img.save(path)
-    return pg.image.load(path)
-
-def get_minimap_effect() -> pg.Surface:
-    assets_path: str = ""
+effect_cache: dict[str, pg.Surface] = {}
+effect_version: int = 1
+
+def get_effect(name: str, params: list, size: tuple[int, int],
+generate: callable) -> pg.Surface:
+    key: str = hashlib.sha1(
+        json.dumps([name, effect_version, params]).encode()
+    ).hexdigest()[:16]
+
+    if key in effect_cache: return effect_cache[key]
+
+    cache_path: str = ""
     with open("../paths.json") as file:
         paths: dict[str, str] = json.load(file)
-        assets_path = paths["assets"]
+        cache_path = paths["cache"]
+
+    path: str = cache_path + "/" + name + "-" + key + ".npy"
 
-    size = 1024
+    pixels: np.ndarray | None = None
+    try: pixels = np.load(path)
+    except (OSError, ValueError, EOFError): pass
+
+    if (pixels is None or pixels.shape != (*size, 3)
+    or pixels.dtype != np.uint8):
+        pixels = generate()
+        os.makedirs(cache_path, exist_ok=True)
+        np.save(path, pixels)
+
+    effect_cache[key] = pg.surfarray.make_surface(pixels)
+    return effect_cache[key]
+
+def lerp_color(start: tuple[int, int, int], end: tuple[int, int, int],
+t: np.ndarray) -> np.ndarray:
+    start_arr: np.ndarray = np.array(start, dtype=np.float64)
+    end_arr: np.ndarray = np.array(end, dtype=np.float64)
+
+    return (
+        (end_arr - start_arr) * t[..., np.newaxis] + start_arr
+    ).astype(np.uint8)
+
+def get_gradient(start: tuple[int, int, int],
+end: tuple[int, int, int], size: tuple[int, int]) -> pg.Surface:
+    def generate() -> np.ndarray:
+        y: np.ndarray = np.arange(size[1]) + 0.5
+        t: np.ndarray = np.abs(y - size[1] / 2) / size[1] * 2
+        t = np.broadcast_to(t, size)
+
+        return lerp_color(start, end, t)
+
+    return get_effect("gradient", [start, end, size], size, generate)
+
+def get_minimap_effect(size: tuple[int, int]) -> pg.Surface:
     strips: int = 4
-    img: Image.Image = Image.new("RGB", (size, size))
-    draw: ImageDraw.ImageDraw = ImageDraw.Draw(img)
-    
-    for i in range(strips):
-        color = (0x002200, 0x000000)[i % 2]
-        y1: int = int(size * i / strips)
-        j: int = 0
+    lines: int = 16
 
-        while j / 32 < 32:
-            draw.line((0, y1 + j, size, y1 + j), color, 32)
-            j += 64
+    def generate() -> np.ndarray:
+        y: np.ndarray = (np.arange(size[1]) + 0.5) / size[1]
+        strip: np.ndarray = (y * strips).astype(np.int32)
+        line: np.ndarray = (y * lines + 0.25) % 1 < 0.5
+        lit: np.ndarray = np.broadcast_to(line & (strip % 2 == 0), size)
 
-    path: str = assets_path + "/minimap_effect.jpg"
-    img.save(path)
-    return pg.image.load(path)
+        pixels: np.ndarray = np.zeros((*size, 3), dtype=np.uint8)
+        pixels[lit, 1] = 0x22
+        return pixels
 
-def get_vignette(start: tuple[int, int, int],
-end: tuple[int, int, int], name: str) -> pg.Surface:
-    assets_path: str = ""
-    with open("../paths.json") as file:
-        paths: dict[str, str] = json.load(file)
-        assets_path = paths["assets"]
+    return get_effect("minimap_effect", [size], size, generate)
 
-    size = 1024
-    x: int = int(size / 2)
-    y: int = int(size / 2)
-    img: Image.Image = Image.new("RGB", (size, size))
-    draw: ImageDraw.ImageDraw = ImageDraw.Draw(img)
+def get_vignette(start: tuple[int, int, int],
+end: tuple[int, int, int], name: str, size: tuple[int, int]) -> pg.Surface:
     p: int = 64
     s: float = 0.71
 
-    for i in range(p, 0, -1):
-        t: float = (i / p)
-        c: float = t**4
-        r2: float = int(t * size * s)
-        draw.ellipse((x - r2, y - r2, x + r2, y + r2), (
-            int((end[0] - start[0]) * c + start[0]),
-            int((end[1] - start[1]) * c + start[1]),
-            int((end[2] - start[2]) * c + start[2])
-        ))
+    def generate() -> np.ndarray:
+        x: np.ndarray = (np.arange(size[0]) + 0.5) / size[0] - 0.5
+        y: np.ndarray = (np.arange(size[1]) + 0.5) / size[1] - 0.5
+        dist: np.ndarray = np.hypot(x[:, np.newaxis], y[np.newaxis, :])
+
+        t: np.ndarray = np.ceil(dist / s * p) / p
+        pixels: np.ndarray = lerp_color(start, end, t**4)
+        pixels[t > 1] = 0
+        return pixels
 
-    path: str = assets_path + "/" + name + ".jpg"
-    img.save(path)
-    return pg.image.load(path)
+    return get_effect(name, [start, end, size], size, generate)
 
 if __name__ == "__main__":
-    get_vignette((255, 255, 255), (0, 0, 0), "vignette")
-    get_vignette((255, 255, 255), (255, 0, 0), "low_health_vignette")
\ No newline at end of file
+    pg.init()
+    get_vignette((255, 255, 255), (0, 0, 0), "vignette", (768, 512))
+    get_vignette((255, 255, 255), (255, 0, 0), "low_health_vignette", (768, 512))
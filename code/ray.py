@@ -3,16 +3,32 @@ import math
 from tile_map import TileMap
 from tile import Tile
 from map_object import MapObject
+from ray_caster import RayHits
 
 class Ray(MapObject):
+    font: pg.font.Font | None = None
 
-    def __init__(self, x: float, y: float, angle: float, tile_map: TileMap):
+    def __init__(self, x: float, y: float, angle: float, tile_map: TileMap,
+    cast: bool=True):
         self.tile_map = tile_map
         self.tile_size = self.tile_map.tile_size
-        self.font: pg.font.Font = pg.font.Font(size=16)
         self.set_angle(angle)
         self.set_xy(x, y)
-        self.update()
+
+        self.reset_hit()
+        self.update_plane_dist(angle)
+        if cast: self.update()
+
+
+    def reset_hit(self) -> None:
+        self.rel_int: tuple[float, float] | None = None
+        self.int_axis: int | None = None
+        self.abs_int: tuple[float, float] | None = None
+        self.grid_int: tuple[int, int] | None = None
+        self.sub_grid_int: tuple[float, float] | None = None
+        self.tile_int: Tile | None = None
+        self.dist: float | None = None
+        self.has_int: bool = False
 
 
     def set_xy(self, x: float, y: float) -> None:
@@ -26,6 +42,29 @@ class Ray(MapObject):
         self.update_angle()
 
 
+    def set_hit(self, hits: RayHits, i: int, cam_angle: float) -> None:
+        self.angle = float(hits.angles[i])
+        self.x = hits.x
+        self.y = hits.y
+
+        self.reset_hit()
+        self.has_int = bool(hits.has_int[i])
+
+        if self.has_int:
+            self.int_axis = int(hits.axis[i])
+            self.abs_int = (float(hits.int_x[i]), float(hits.int_y[i]))
+            self.rel_int = (self.abs_int[0] - self.x, self.abs_int[1] - self.y)
+            self.grid_int = (int(hits.cell_x[i]), int(hits.cell_y[i]))
+            self.tile_int = self.tile_map.get_tile(*self.grid_int)
+            self.sub_grid_int = (
+                (self.abs_int[0] / self.tile_size) % 1,
+                (self.abs_int[1] / self.tile_size) % 1
+            )
+            self.dist = float(hits.dist[i])
+
+        self.update_plane_dist(cam_angle)
+
+
     def update_plane_dist(self, angle: float) -> None:
         self.angle_diff: float | None = None
         self.plane_dist: float | None = None
@@ -101,14 +140,8 @@ class Ray(MapObject):
         # self.update_angle()
 
         intersection: tuple[float, float, int] | None = self.get_intersection()
-        self.rel_int: tuple[float, float] | None = None
-        self.int_axis: int | None = None
-        self.abs_int: tuple[float, float] | None = None
-        self.grid_int: tuple[int, int] | None = None
-        self.sub_grid_int: tuple[float, float] | None = None
-        self.tile_int: Tile | None = None
-        self.dist: float | None = None
-        self.has_int: bool = not intersection is None
+        self.reset_hit()
+        self.has_int = not intersection is None
 
         if not self.has_int: return
 
@@ -235,6 +268,8 @@ class Ray(MapObject):
 
 
     def draw_text(self, surf: pg.Surface) -> None:
+        if Ray.font is None: Ray.font = pg.font.Font(size=16)
+
         text: pg.Surface = self.font.render(
             str(self.sub_grid_int), False, 0, 0xFFFFFF
         )
@@ -283,7 +318,4 @@ class Ray(MapObject):
         )
         
         tint: int = int(255 * inv_dist)
-        self.tile_int.draw(
-            surf, slice_num,
-            rect, tint + (tint << 8) + (tint << 16)
-        )
\ No newline at end of file
+        self.tile_int.draw(surf, slice_num, rect, tint)
\ No newline at end of file
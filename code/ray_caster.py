@@ -0,0 +1,205 @@
+import numpy as np
+from tile_map import TileMap
+from map_object import MapObject
+from distance_field import DistanceField
+
+class RayHits:
+    fields: list[tuple[str, type]] = [
+        ("has_int", bool),
+        ("dist", np.float64),
+        ("axis", np.int8),
+        ("tile", np.int32),
+        ("u", np.float64),
+        ("int_x", np.float64),
+        ("int_y", np.float64),
+        ("cell_x", np.int32),
+        ("cell_y", np.int32)
+    ]
+
+    def __init__(self, x: float, y: float, angles: np.ndarray,
+    buffers: dict[str, np.ndarray] | None=None) -> None:
+        count: int = len(angles)
+        self.x = x
+        self.y = y
+        self.angles = angles
+        self.count = count
+
+        for name, dtype in self.fields:
+            if buffers is None:
+                array: np.ndarray = np.zeros(count, dtype=dtype)
+            else:
+                array: np.ndarray = buffers[name][:count]
+                array.fill(0)
+
+            setattr(self, name, array)
+
+
+class RayCaster:
+
+    def __init__(self, tile_map: TileMap, max_skip: int=16) -> None:
+        self.tile_map = tile_map
+        self.tile_size = self.tile_map.tile_size
+        self.distance_field: DistanceField = DistanceField(max_skip)
+        self.origin: tuple[int, int] = (0, 0)
+        self.tile_map.add_listener(self.update_tile)
+
+
+    @property
+    def palette(self) -> list[str | None]:
+        return [
+            None if tile is None else tile.name
+            for tile in self.tile_map.palette
+        ]
+
+
+    def get_worker_count(self) -> int:
+        return 1
+
+
+    def close(self) -> None:
+        self.tile_map.remove_listener(self.update_tile)
+
+
+    def update_tile(self, x: int, y: int) -> None:
+        self.distance_field.update(x - self.origin[0], y - self.origin[1])
+
+
+    def get_field(self, grid: np.ndarray, origin_x: int,
+    origin_y: int) -> DistanceField:
+        if not self.distance_field.grid is grid:
+            self.distance_field.build(grid)
+        self.origin = (origin_x, origin_y)
+
+        return self.distance_field
+
+
+    def cast(self, x: float, y: float, angles: np.ndarray) -> RayHits:
+        hits: RayHits = RayHits(x, y, angles)
+        depth: int = MapObject.depth
+
+        px: float = x / self.tile_size
+        py: float = y / self.tile_size
+        grid, origin_x, origin_y = self.tile_map.get_window(px, py, depth + 1)
+        distance_field: DistanceField = self.get_field(
+            grid, origin_x, origin_y
+        )
+
+        RayCaster.cast_grid(
+            hits, grid, distance_field.field, distance_field.max_value > 1,
+            (origin_x, origin_y), self.tile_size, depth
+        )
+        return hits
+
+
+    def cast_grid(hits: RayHits, grid: np.ndarray, field: np.ndarray,
+    use_field: bool, origin: tuple[int, int], tile_size: int,
+    depth: int) -> None:
+        angles: np.ndarray = hits.angles
+        count: int = hits.count
+        origin_x, origin_y = origin
+        height, width = grid.shape
+        px: float | np.ndarray = np.asarray(hits.x) / tile_size
+        py: float | np.ndarray = np.asarray(hits.y) / tile_size
+        per_ray: bool = px.ndim > 0
+
+        cos: np.ndarray = np.cos(angles)
+        sin: np.ndarray = np.sin(angles)
+        cos[np.abs(cos) < 1e-12] = 1e-12
+        sin[np.abs(sin) < 1e-12] = 1e-12
+
+        step_x: np.ndarray = np.where(cos > 0, 1, -1)
+        step_y: np.ndarray = np.where(sin > 0, 1, -1)
+        near_x: np.ndarray = (step_x > 0) + (origin_x - px)
+        near_y: np.ndarray = (step_y > 0) + (origin_y - py)
+
+        ids: np.ndarray = np.arange(count)
+        map_x: np.ndarray = np.broadcast_to(
+            np.floor(px) - origin_x, count
+        ).astype(np.int32)
+        map_y: np.ndarray = np.broadcast_to(
+            np.floor(py) - origin_y, count
+        ).astype(np.int32)
+        can_skip: bool = use_field and bool(np.all(
+            (map_x >= 0) & (map_x < width) &
+            (map_y >= 0) & (map_y < height)
+        ))
+        skip: np.ndarray | int = 1
+
+        for _ in range(2 * depth + 2):
+            ray_cos: np.ndarray = cos[ids]
+            ray_sin: np.ndarray = sin[ids]
+            ray_step_x: np.ndarray = step_x[ids]
+            ray_step_y: np.ndarray = step_y[ids]
+            side_x: np.ndarray = map_x + near_x[ids]
+            side_y: np.ndarray = map_y + near_y[ids]
+
+            if can_skip:
+                skip = field[map_y, map_x].astype(np.int32)
+                np.maximum(skip, 1, out=skip)
+                side_x += ray_step_x * (skip - 1)
+                side_y += ray_step_y * (skip - 1)
+
+            side_x /= ray_cos
+            side_y /= ray_sin
+
+            vertical: np.ndarray = side_x < side_y
+            dist: np.ndarray = np.where(vertical, side_x, side_y)
+            rel_x: np.ndarray = ray_cos * dist
+            rel_y: np.ndarray = ray_sin * dist
+
+            if can_skip:
+                ray_px: float | np.ndarray = px[ids] if per_ray else px
+                ray_py: float | np.ndarray = py[ids] if per_ray else py
+                jump: np.ndarray = skip > 1
+                free_x: np.ndarray = np.where(
+                    jump, np.floor(ray_px + rel_x) - origin_x, map_x
+                )
+                free_y: np.ndarray = np.where(
+                    jump, np.floor(ray_py + rel_y) - origin_y, map_y
+                )
+            else:
+                free_x: np.ndarray = map_x
+                free_y: np.ndarray = map_y
+
+            map_x = np.where(
+                vertical, map_x + ray_step_x * skip, free_x
+            ).astype(np.int32)
+            map_y = np.where(
+                vertical, free_y, map_y + ray_step_y * skip
+            ).astype(np.int32)
+
+            active: np.ndarray = (
+                (map_x >= 0) & (map_x < width) &
+                (map_y >= 0) & (map_y < height) &
+                (np.maximum(np.abs(rel_x), np.abs(rel_y)) <= depth)
+            )
+
+            tile: np.ndarray = np.zeros(len(ids), dtype=np.int32)
+            tile[active] = grid[map_y[active], map_x[active]]
+            new_int: np.ndarray = tile > 0
+
+            if new_int.any():
+                hit: np.ndarray = ids[new_int]
+                hit_px: float | np.ndarray = px[hit] if per_ray else px
+                hit_py: float | np.ndarray = py[hit] if per_ray else py
+                int_x: np.ndarray = (hit_px + rel_x[new_int]) * tile_size
+                int_y: np.ndarray = (hit_py + rel_y[new_int]) * tile_size
+                axis: np.ndarray = vertical[new_int]
+
+                hits.has_int[hit] = True
+                hits.dist[hit] = dist[new_int] * tile_size
+                hits.axis[hit] = axis
+                hits.tile[hit] = tile[new_int]
+                hits.int_x[hit] = int_x
+                hits.int_y[hit] = int_y
+                hits.cell_x[hit] = map_x[new_int] + origin_x
+                hits.cell_y[hit] = map_y[new_int] + origin_y
+                hits.u[hit] = np.where(
+                    axis, int_y / tile_size, int_x / tile_size
+                ) % 1
+
+            active &= ~new_int
+            ids = ids[active]
+            map_x = map_x[active]
+            map_y = map_y[active]
+            if len(ids) == 0: break
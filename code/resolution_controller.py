@@ -0,0 +1,80 @@
+from collections import deque
+
+class ResolutionController:
+    levels: list[tuple[int, int]] = [
+        (64, 256),
+        (96, 320),
+        (128, 384),
+        (128, 512),
+        (192, 512),
+        (256, 512),
+        (384, 512),
+        (768, 512)
+    ]
+
+    def __init__(self, output_size: tuple[int, int], budget_ms: float=16.6,
+    window: int=30, level: int=3) -> None:
+        self.output_size = output_size
+        self.budget_ms = budget_ms
+        self.window = window
+        self.level = level
+
+        self.lower_threshold: float = 0.95
+        self.raise_threshold: float = 0.6
+        self.frame_times: deque[float] = deque(maxlen=self.window)
+
+
+    def get_ray_count(self) -> int:
+        return self.levels[self.level][0]
+
+
+    def get_render_size(self) -> tuple[int, int]:
+        ray_count, height = self.levels[self.level]
+        width: float = self.output_size[0] * height / self.output_size[1]
+        step_x: int = max(round(width / ray_count), 1)
+
+        return (ray_count * step_x, height)
+
+
+    def get_mean_frame_time(self) -> float | None:
+        if len(self.frame_times) == 0: return None
+        return sum(self.frame_times) / len(self.frame_times)
+
+
+    def get_headroom(self) -> float | None:
+        mean: float | None = self.get_mean_frame_time()
+        if mean is None: return None
+        return 1 - mean / self.budget_ms
+
+
+    def add_frame_time(self, frame_ms: float, adapt: bool=True) -> bool:
+        self.frame_times.append(frame_ms)
+        if not adapt or len(self.frame_times) < self.window: return False
+
+        mean: float = self.get_mean_frame_time()
+        level: int = self.level
+
+        if mean > self.budget_ms * self.lower_threshold and level > 0:
+            level -= 1
+        elif (mean < self.budget_ms * self.raise_threshold
+        and level < len(self.levels) - 1):
+            level += 1
+
+        if level == self.level: return False
+
+        self.level = level
+        self.frame_times.clear()
+        return True
+
+
+    def get_telemetry(self) -> dict[str, float | int | list[int] | None]:
+        mean: float | None = self.get_mean_frame_time()
+        headroom: float | None = self.get_headroom()
+
+        return {
+            "ray_count": self.get_ray_count(),
+            "render_size": list(self.get_render_size()),
+            "budget_ms": self.budget_ms,
+            "frame_ms": None if mean is None else round(mean, 4),
+            "headroom": None if headroom is None else round(headroom, 4)
+        }
@@ -0,0 +1,101 @@
+import math
+
+class SpatialHash:
+
+    def __init__(self, cell_size: int) -> None:
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], set] = {}
+        self.object_cells: dict[object, list[tuple[int, int]]] = {}
+
+
+    def get_cells(self, x: float, y: float,
+    width: float, height: float) -> list[tuple[int, int]]:
+        x0: int = math.floor((x - width / 2) / self.cell_size)
+        y0: int = math.floor((y - height / 2) / self.cell_size)
+        x1: int = math.floor((x + width / 2) / self.cell_size)
+        y1: int = math.floor((y + height / 2) / self.cell_size)
+
+        return [
+            (cx, cy)
+            for cx in range(x0, x1 + 1)
+            for cy in range(y0, y1 + 1)
+        ]
+
+
+    def get_object_cells(self, obj: object) -> list[tuple[int, int]]:
+        return self.get_cells(obj.x, obj.y, obj.width, obj.height)
+
+
+    def insert(self, obj: object) -> None:
+        cells: list[tuple[int, int]] = self.get_object_cells(obj)
+        self.object_cells[obj] = cells
+
+        for cell in cells:
+            if not cell in self.cells: self.cells[cell] = set()
+            self.cells[cell].add(obj)
+
+
+    def remove(self, obj: object) -> None:
+        cells: list[tuple[int, int]] | None = self.object_cells.pop(obj, None)
+        if cells is None: return
+
+        for cell in cells:
+            bucket: set = self.cells[cell]
+            bucket.discard(obj)
+            if len(bucket) == 0: del self.cells[cell]
+
+
+    def update(self, obj: object) -> None:
+        if not obj in self.object_cells:
+            self.insert(obj)
+            return
+
+        if self.get_object_cells(obj) == self.object_cells[obj]: return
+
+        self.remove(obj)
+        self.insert(obj)
+
+
+    def clear(self) -> None:
+        self.cells.clear()
+        self.object_cells.clear()
+
+
+    def query_rect(self, x: float, y: float,
+    width: float, height: float) -> set:
+        found: set = set()
+
+        for cell in self.get_cells(x, y, width, height):
+            bucket: set | None = self.cells.get(cell)
+            if not bucket is None: found |= bucket
+
+        return found
+
+
+    def query_object(self, obj: object) -> set:
+        found: set = self.query_rect(obj.x, obj.y, obj.width, obj.height)
+        found.discard(obj)
+        return found
+
+
+    def query_radius(self, x: float, y: float, radius: float) -> list:
+        found: list = []
+
+        for obj in self.query_rect(x, y, radius * 2, radius * 2):
+            if math.hypot(obj.x - x, obj.y - y) <= radius:
+                found.append(obj)
+
+        return found
+
+
+    def query_pairs(self) -> list[tuple[object, object]]:
+        pairs: set[tuple[object, object]] = set()
+
+        for bucket in self.cells.values():
+            objs: list = sorted(bucket, key=id)
+
+            for i in range(len(objs)):
+                for j in range(i + 1, len(objs)):
+                    pairs.add((objs[i], objs[j]))
+
+        return list(pairs)
@@ -0,0 +1,85 @@
+import pygame as pg
+from collections import OrderedDict
+
+class SpriteCache:
+
+    def __init__(self, max_bytes: int=16 * 1024 * 1024,
+    scale_step: float=1 / 128, tint_step: int=4) -> None:
+        self.max_bytes = max_bytes
+        self.scale_step = scale_step
+        self.tint_step = tint_step
+        self.mips: dict[str, list[pg.Surface]] = {}
+        self.sprites: OrderedDict[tuple, pg.Surface] = OrderedDict()
+        self.size_bytes: int = 0
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+
+    def add_sprite(self, name: str, mips: list[pg.Surface]) -> None:
+        self.mips[name] = sorted(
+            mips, key=lambda mip: mip.get_width(), reverse=True
+        )
+
+
+    def get_mip(self, name: str, width: float) -> pg.Surface:
+        mips: list[pg.Surface] = self.mips[name]
+        mip: pg.Surface = mips[0]
+
+        for current in mips:
+            if current.get_width() < width: break
+            mip = current
+
+        return mip
+
+
+    def get_surface_bytes(self, surf: pg.Surface) -> int:
+        return surf.get_width() * surf.get_height() * surf.get_bytesize()
+
+
+    def get_sprite(self, name: str, scale: float, tint: int) -> pg.Surface:
+        scale_level: int = max(int(round(scale / self.scale_step)), 1)
+        tint = min(int(round(tint / self.tint_step)) * self.tint_step, 255)
+        key: tuple[str, int, int] = (name, scale_level, tint)
+
+        sprite: pg.Surface | None = self.sprites.get(key)
+        if not sprite is None:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+            return sprite
+
+        self.misses += 1
+        base: pg.Surface = self.mips[name][0]
+        size: tuple[int, int] = (
+            max(int(base.get_width() * scale_level * self.scale_step), 1),
+            max(int(base.get_height() * scale_level * self.scale_step), 1)
+        )
+
+        sprite = pg.transform.scale(self.get_mip(name, size[0]), size)
+        sprite.fill((tint, tint, tint), special_flags=pg.BLEND_RGB_MULT)
+
+        self.sprites[key] = sprite
+        self.size_bytes += self.get_surface_bytes(sprite)
+
+        while self.size_bytes > self.max_bytes and len(self.sprites) > 1:
+            _, evicted = self.sprites.popitem(last=False)
+            self.size_bytes -= self.get_surface_bytes(evicted)
+            self.evictions += 1
+
+        return sprite
+
+
+    def clear(self) -> None:
+        self.sprites.clear()
+        self.size_bytes = 0
+
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "size": len(self.sprites),
+            "bytes": self.size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
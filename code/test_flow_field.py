@@ -0,0 +1,46 @@
+import numpy as np
+from tile_map import TileMap
+from entity import Entity
+from entity_store import EntityStore
+from flow_field import FlowField
+
+def make_walled_map() -> TileMap:
+    tile_map: TileMap = TileMap((10, 10), 32)
+    tile_map.grid[0:8, 5] = 1
+    return tile_map
+
+
+def test_distances_route_around_wall() -> None:
+    free: np.ndarray = make_walled_map().grid == 0
+    distances: np.ndarray = FlowField.get_distances(free, 8, 2)
+
+    assert distances[2, 8] == 0
+    assert distances[2, 5] == -1
+    assert distances[2, 4] == 3 + 6 + 6 + 1
+    assert distances[9, 5] == 3 + 7
+
+
+def test_chaser_moves_toward_player_around_wall() -> None:
+    tile_map: TileMap = make_walled_map()
+    store: EntityStore = EntityStore(tile_map)
+    flow_field: FlowField = FlowField(tile_map)
+
+    chaser: Entity = Entity("ghost", 2.5 * 32, 2.5 * 32, tile_map)
+    chaser.set_chase_speed(2)
+    store.add(chaser)
+    target: tuple[float, float] = (8.5 * 32, 2.5 * 32)
+
+    flow_field.set_target(*target)
+    start: int | None = flow_field.get_distance(chaser.x, chaser.y)
+    lowest_y: float = chaser.y
+    for _ in range(600):
+        store.save_state()
+        flow_field.set_target(*target)
+        store.steer(flow_field)
+        store.update()
+        lowest_y = max(lowest_y, chaser.y)
+
+    flow_field.close()
+    assert start == 6 + 6 + 6
+    assert lowest_y > 8 * 32
+    assert np.hypot(chaser.x - target[0], chaser.y - target[1]) < 32
@@ -1,9 +1,13 @@
 import pygame as pg
 import json
 import preload
+from column_cache import ColumnCache
 
 class Tile:
+    textures: dict[str, pg.Surface] = {}
     texture_slices: dict[str, list[pg.Surface]] = {}
+    column_cache: ColumnCache = ColumnCache()
+    types: dict[str, "Tile"] = {}
 
     def init() -> None:
         textures: list[str] = []
@@ -11,7 +15,15 @@ class Tile:
             textures = json.load(file)
 
         for name in textures:
-            Tile.texture_slices[name] = preload.get_texture_slices(name)
+            Tile.textures[name] = preload.get_texture(name)
+            Tile.texture_slices[name] = preload.get_texture_slices(
+                Tile.textures[name]
+            )
+
+
+    def get(name: str) -> "Tile":
+        if not name in Tile.types: Tile.types[name] = Tile(name)
+        return Tile.types[name]
 
 
     def __init__(self, name: str):
@@ -21,8 +33,10 @@ class Tile:
 
     def draw(self, surf: pg.Surface, slice_num: int,
     rect: tuple[int, int, int, int], tint: int) -> None:
-        tinted: pg.Surface = self.texture_slices[self.name][slice_num].copy()
-        tinted.fill(tint, special_flags=pg.BLEND_RGB_MULT)
-        tinted = pg.transform.scale(tinted, rect[2:4])
-        
-        surf.blit(tinted, rect[0:2])
\ No newline at end of file
+        column: pg.Surface = Tile.column_cache.get_column(
+            self.name, slice_num, self.texture_slices[self.name][slice_num],
+            rect[2:4], tint
+        )
+        y: int = rect[1] + int((rect[3] - column.get_height()) / 2)
+
+        surf.blit(column, (rect[0], y))
\ No newline at end of file
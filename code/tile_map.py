@@ -1,18 +1,189 @@
 import pygame as pg
+import numpy as np
+import json
+import math
+import struct
+from collections import OrderedDict
 from tile import Tile
 
 class TileMap:
+    binary_magic: bytes = b"TMAP"
+    binary_header: str = "<4sIIIH"
+    window_size: int = 16
+    max_windows: int = 4
+
+    def load_json(path: str, tile_size: int) -> "TileMap":
+        with open(path) as file:
+            rows: list[list[str | None]] = json.load(file)
+
+        tile_map: TileMap = TileMap((len(rows[0]), len(rows)), tile_size)
+        names: list[str | None] = sorted(
+            {name for row in rows for name in row if not name is None}
+        )
+        ids: dict[str | None, int] = {None: 0}
+
+        for name in names:
+            ids[name] = tile_map.get_tile_id(Tile.get(name))
+
+        tile_map.grid = np.array(
+            [[ids[name] for name in row] for row in rows],
+            dtype=tile_map.grid.dtype
+        )
+        return tile_map
+
+
+    def load_binary(path: str) -> "TileMap":
+        with open(path, "rb") as file:
+            data: bytes = file.read()
+
+        header_size: int = struct.calcsize(TileMap.binary_header)
+        magic, width, height, tile_size, palette_size = struct.unpack_from(
+            TileMap.binary_header, data
+        )
+        if magic != TileMap.binary_magic:
+            raise ValueError(f"{path} is not a binary tile map")
+
+        tile_map: TileMap = TileMap((width, height), tile_size)
+        offset: int = header_size
+
+        for _ in range(palette_size - 1):
+            length: int = data[offset]
+            name: str = data[offset + 1:offset + 1 + length].decode()
+            tile_map.get_tile_id(Tile.get(name))
+            offset += 1 + length
+
+        tile_map.grid = np.frombuffer(
+            data, dtype=tile_map.grid.dtype.newbyteorder("<"),
+            count=width * height, offset=offset
+        ).reshape((height, width)).astype(tile_map.grid.dtype)
+        return tile_map
+
 
     def __init__(self, map_size: tuple[int, int], tile_size: int):
         self.map_size = map_size
         self.tile_size = tile_size
-        self.grid: list[Tile | None] = [
-            None for _ in range(self.map_size[0] * self.map_size[1])
-        ]
+        self.palette: list[Tile | None] = [None]
+        self.palette_ids: dict[str, int] = {}
+        self.grid: np.ndarray = np.zeros(
+            (self.map_size[1], self.map_size[0]), dtype=np.uint8
+        )
+        self.windows: OrderedDict[
+            tuple[int, ...], tuple[np.ndarray, np.ndarray]
+        ] = OrderedDict()
+        self.init_layer()
+
+
+    def init_layer(self) -> None:
+        self.revision: int = 0
+        self.listeners: list[callable] = []
+        self.layer: pg.Surface | None = None
+        self.dirty_tiles: set[int] = set()
+        self.background_color: int = 0x002200
+        self.tile_color: int = 0x008800
+
+
+    def add_listener(self, listener: callable) -> None:
+        self.listeners.append(listener)
+
+
+    def remove_listener(self, listener: callable) -> None:
+        if listener in self.listeners: self.listeners.remove(listener)
+
+
+    def get_tile_id(self, tile: Tile | None) -> int:
+        if tile is None: return 0
+        if tile.name in self.palette_ids: return self.palette_ids[tile.name]
+
+        if len(self.palette) > np.iinfo(self.grid.dtype).max:
+            self.grid = self.grid.astype(np.uint16)
+
+        self.palette_ids[tile.name] = len(self.palette)
+        self.palette.append(Tile.get(tile.name))
+        return self.palette_ids[tile.name]
+
+
+    def save_binary(self, path: str) -> None:
+        header: bytes = struct.pack(
+            TileMap.binary_header, TileMap.binary_magic,
+            self.map_size[0], self.map_size[1],
+            self.tile_size, len(self.palette)
+        )
+        names: bytes = b"".join(
+            bytes((len(tile.name.encode()),)) + tile.name.encode()
+            for tile in self.palette[1:]
+        )
+
+        with open(path, "wb") as file:
+            file.write(header)
+            file.write(names)
+            file.write(self.grid.astype(
+                self.grid.dtype.newbyteorder("<")
+            ).tobytes())
+
+
+    def set_tile(self, x: int, y: int, tile: Tile | None) -> None:
+        tile_id: int = self.get_tile_id(tile)
+        if self.grid[y, x] == tile_id: return
+
+        self.grid[y, x] = tile_id
+        self.notify_tile(x, y)
+
 
+    def notify_tile(self, x: int, y: int) -> None:
+        self.revision += 1
+        self.dirty_tiles.add(self.get_idx(x, y))
 
-    def draw(self, surf: pg.Surface) -> None:
-        self.draw_tiles(surf)
+        for listener in self.listeners:
+            listener(x, y)
+
+
+    def draw(self, surf: pg.Surface,
+    area: tuple[int, int, int, int] | None=None) -> None:
+        layer: pg.Surface = self.get_layer(surf.get_size())
+
+        if area is None: surf.blit(layer, (0, 0))
+        else: surf.blit(layer, area[0:2], area)
+
+
+    def get_layer(self, size: tuple[int, int]) -> pg.Surface:
+        if self.layer is None or self.layer.get_size() != size:
+            self.layer = pg.surface.Surface(size)
+            self.layer.fill(self.background_color)
+            self.draw_tiles(self.layer)
+            self.dirty_tiles.clear()
+
+        elif len(self.dirty_tiles) > 0:
+            self.draw_dirty_tiles(self.layer)
+
+        return self.layer
+
+
+    def get_tile_rect(self, idx: int,
+    scale: tuple[float, float]) -> tuple[int, int, int, int]:
+        x, y = self.get_pos(idx)
+
+        return (
+            int(x * self.tile_size * scale[0]),
+            int(y * self.tile_size * scale[1]),
+            int(self.tile_size * scale[0]),
+            int(self.tile_size * scale[1])
+        )
+
+
+    def draw_dirty_tiles(self, surf: pg.Surface) -> None:
+        scale: tuple[float, float] = (
+            surf.get_width() / 512,
+            surf.get_height() / 512,
+        )
+
+        for idx in self.dirty_tiles:
+            if self.get_tile(*self.get_pos(idx)) is None:
+                color: int = self.background_color
+            else: color: int = self.tile_color
+
+            pg.draw.rect(surf, color, self.get_tile_rect(idx, scale))
+
+        self.dirty_tiles.clear()
 
 
     def draw_grid(self, surf: pg.Surface) -> None:
@@ -50,21 +221,8 @@ class TileMap:
             surf.get_height() / 512,
         )
 
-        for idx in range(len(self.grid)):
-            tile: Tile | None = self.grid[idx]
-
-            if not tile is None:
-                size: tuple[int, int] = (
-                    int(self.tile_size * scale[0]),
-                    int(self.tile_size * scale[1])
-                )
-                pos: tuple[int, int] = (
-                    int(self.get_pos(idx)[0] * self.tile_size * scale[0]),
-                    int(self.get_pos(idx)[1] * self.tile_size * scale[0])
-                )
-
-                color: int = 0x008800
-                pg.draw.rect(surf, color, (pos, size))
+        for idx in np.flatnonzero(self.grid):
+            pg.draw.rect(surf, self.tile_color, self.get_tile_rect(idx, scale))
 
 
     def get_idx(self, x: int, y: int) -> int:
@@ -72,11 +230,48 @@ class TileMap:
 
 
     def get_tile(self, x: int, y: int) -> Tile | None:
-        return self.grid[self.get_idx(x, y)]
+        return self.palette[self.grid[y, x]]
     
 
+    def get_free_mask(self, tile_x: np.ndarray,
+    tile_y: np.ndarray) -> np.ndarray:
+        height, width = self.grid.shape
+        inside: np.ndarray = (
+            (tile_x >= 0) & (tile_x < width) & (tile_y >= 0) & (tile_y < height)
+        )
+
+        free: np.ndarray = np.zeros(np.shape(tile_x), dtype=bool)
+        free[inside] = self.grid[tile_y[inside], tile_x[inside]] == 0
+        return free
+
+
+    def get_window(self, x: float, y: float,
+    radius: int) -> tuple[np.ndarray, int, int]:
+        size: int = self.window_size
+        x0: int = max(math.floor(x - radius) // size, 0) * size
+        y0: int = max(math.floor(y - radius) // size, 0) * size
+        x1: int = min(
+            (math.floor(x + radius) // size + 1) * size, self.map_size[0]
+        )
+        y1: int = min(
+            (math.floor(y + radius) // size + 1) * size, self.map_size[1]
+        )
+        key: tuple[int, ...] = (x0, y0, x1, y1)
+
+        window: tuple[np.ndarray, np.ndarray] | None = self.windows.get(key)
+        if window is None or not window[0] is self.grid:
+            window = (self.grid, self.grid[y0:y1, x0:x1])
+            self.windows[key] = window
+            if len(self.windows) > self.max_windows:
+                self.windows.popitem(last=False)
+        else:
+            self.windows.move_to_end(key)
+
+        return window[1], x0, y0
+
+
     def get_pos(self, idx: int) -> tuple[int, int]:
-        return idx % self.map_size[0], idx // self.map_size[1]
+        return idx % self.map_size[0], idx // self.map_size[0]
     
 
     def is_pos_in_bounds(self, x: int | float, y: int | float) -> bool:
@@ -0,0 +1,70 @@
+import pygame as pg
+
+class Widget:
+
+    def __init__(self, rect: tuple[int, int, int, int],
+    get_state: callable, draw: callable) -> None:
+        self.rect: pg.Rect = pg.Rect(rect)
+        self.get_state = get_state
+        self.draw = draw
+        self.state: object = None
+
+
+class UILayer:
+
+    def __init__(self, surf: pg.Surface, background: pg.Surface,
+    offset: tuple[int, int]) -> None:
+        self.surf = surf
+        self.background = background
+        self.offset = offset
+        self.widgets: list[Widget] = []
+        self.full_redraw: bool = True
+
+
+    def add_widget(self, rect: tuple[int, int, int, int],
+    get_state: callable, draw: callable) -> Widget:
+        widget: Widget = Widget(rect, get_state, draw)
+        self.widgets.append(widget)
+        self.full_redraw = True
+
+        return widget
+
+
+    def invalidate(self) -> None:
+        self.full_redraw = True
+
+
+    def update(self) -> list[pg.Rect]:
+        dirty_rects: list[pg.Rect] = []
+
+        if self.full_redraw:
+            self.surf.blit(self.background, (0, 0))
+            dirty_rects.append(self.surf.get_rect())
+
+        for widget in self.widgets:
+            state: object = widget.get_state()
+            if not self.full_redraw and state == widget.state: continue
+
+            widget.state = state
+            if not self.full_redraw:
+                self.surf.blit(self.background, widget.rect, widget.rect)
+                dirty_rects.append(widget.rect.copy())
+
+            self.surf.set_clip(widget.rect)
+            widget.draw()
+            self.surf.set_clip(None)
+
+        self.full_redraw = False
+        return dirty_rects
+
+
+    def blit_dirty(self, surf: pg.Surface,
+    dirty_rects: list[pg.Rect]) -> list[pg.Rect]:
+        screen_rects: list[pg.Rect] = []
+
+        for rect in dirty_rects:
+            screen_rect: pg.Rect = rect.move(self.offset)
+            surf.blit(self.surf, screen_rect, rect)
+            screen_rects.append(screen_rect)
+
+        return screen_rects
@@ -0,0 +1,124 @@
+import pygame as pg
+import numpy as np
+from tile import Tile
+from map_object import MapObject
+from ray_caster import RayCaster, RayHits
+
+class WallRenderer:
+
+    def __init__(self, ray_caster: RayCaster, shade_levels: int=64) -> None:
+        self.ray_caster = ray_caster
+        self.tile_size = self.ray_caster.tile_size
+        self.shade_levels = shade_levels
+        self.shifts: tuple[int, ...] | None = None
+        self.update_textures()
+
+
+    def get_texture_array(names: list[str | None]) -> np.ndarray:
+        size: tuple[int, int] = (1, 1)
+        for name in names:
+            if name is None: continue
+            size = Tile.textures[name].get_size()
+            break
+
+        textures: np.ndarray = np.zeros(
+            (len(names), size[0], size[1], 3), dtype=np.uint8
+        )
+
+        for i in range(len(names)):
+            if names[i] is None: continue
+
+            texture: pg.Surface = Tile.textures[names[i]]
+            if texture.get_size() != size:
+                texture = pg.transform.scale(texture, size)
+            textures[i] = pg.surfarray.array3d(texture)
+
+        return textures
+
+
+    def get_shaded_textures(textures: np.ndarray, shade_levels: int,
+    shifts: tuple[int, ...]) -> np.ndarray:
+        shade: np.ndarray = np.linspace(0, 1, shade_levels)
+        rgb: np.ndarray = (
+            textures[:, np.newaxis] *
+            shade[np.newaxis, :, np.newaxis, np.newaxis, np.newaxis]
+        ).astype(np.uint32)
+
+        return (
+            (rgb[..., 0] << shifts[0]) |
+            (rgb[..., 1] << shifts[1]) |
+            (rgb[..., 2] << shifts[2])
+        ).ravel()
+
+
+    def update_textures(self) -> None:
+        self.textures: np.ndarray = WallRenderer.get_texture_array(
+            self.ray_caster.palette
+        )
+        self.texture_size: tuple[int, int] = self.textures.shape[1:3]
+        self.shifts = None
+
+
+    def update_shaded_textures(self, surf: pg.Surface) -> None:
+        self.shifts = surf.get_shifts()
+        self.shaded_textures: np.ndarray = WallRenderer.get_shaded_textures(
+            self.textures, self.shade_levels, self.shifts
+        )
+
+
+    def draw(self, surf: pg.Surface, hits: RayHits,
+    plane_dists: np.ndarray, step_x: int) -> None:
+        if len(self.textures) != len(self.ray_caster.palette):
+            self.update_textures()
+        if self.shifts != surf.get_shifts():
+            self.update_shaded_textures(surf)
+
+        width, height = surf.get_size()
+        inv_dist: np.ndarray = 1 - plane_dists / (
+            self.tile_size * MapObject.depth
+        )
+        drawn: np.ndarray = inv_dist > 0
+        if not drawn.any(): return
+
+        inv_dist = np.where(drawn, inv_dist, 0)
+        wall_height: np.ndarray = height * (
+            MapObject.height_diff * inv_dist**2 + MapObject.min_height
+        )
+        top: np.ndarray = (height / 2 - wall_height / 2).astype(np.int32)
+        shade: np.ndarray = np.round(
+            inv_dist * (self.shade_levels - 1)
+        ).astype(np.int32)
+
+        y0: int = max(int(top[drawn].min()), 0)
+        y1: int = min(int((top + wall_height)[drawn].max()) + 1, height)
+        if y0 >= y1: return
+
+        tex_w, tex_h = self.texture_size
+        rows: np.ndarray = np.arange(y0, y1, dtype=np.float32)
+        scale: np.ndarray = (tex_h / wall_height).astype(np.float32)
+        tex_y: np.ndarray = (
+            (rows[np.newaxis, :] - top[:, np.newaxis].astype(np.float32))
+            * scale[:, np.newaxis]
+        )
+        inside: np.ndarray = (
+            drawn[:, np.newaxis] & (tex_y >= 0) & (tex_y < tex_h)
+        )
+
+        tex_x: np.ndarray = np.minimum(
+            (hits.u * tex_w).astype(np.int32), tex_w - 1
+        )
+        base: np.ndarray = (
+            (hits.tile * self.shade_levels + shade) * tex_w + tex_x
+        ) * tex_h
+        texels: np.ndarray = np.take(
+            self.shaded_textures,
+            tex_y.astype(np.int32) + base[:, np.newaxis], mode="clip"
+        )
+
+        columns: int = min(len(plane_dists) * step_x, width)
+        texels = np.repeat(texels, step_x, axis=0)[:columns]
+        inside = np.repeat(inside, step_x, axis=0)[:columns]
+
+        pixels: np.ndarray = pg.surfarray.pixels2d(surf)
+        np.copyto(pixels[:columns, y0:y1], texels, where=inside)
+        del pixels